@@ -0,0 +1,78 @@
+"""
+Tests for toolbox.cartopy_tools
+"""
+
+import cartopy.crs as ccrs
+import matplotlib.pyplot as plt
+import numpy as np
+import xarray as xr
+
+from toolbox.cartopy_tools import EasyMap
+
+
+def test_domain_dateline():
+    """A domain across the dateline is one polygon on a map centered there"""
+    lon, lat = np.meshgrid(np.arange(160, 200, 0.5), np.arange(30, 60, 0.5))
+    ds = xr.Dataset(
+        coords={"latitude": (("y", "x"), lat), "longitude": (("y", "x"), lon)}
+    )
+
+    m = EasyMap(crs=ccrs.PlateCarree(central_longitude=180), add_coastlines=False)
+    m.DOMAIN(ds)
+    assert m.domain_polygon.geom_type == "Polygon"
+    np.testing.assert_allclose(m.domain_polygon.bounds, (-20, 30, 19.5, 59.5))
+
+    # The lon/lat outline is cached
+    outline = m.domain_polygon_latlon
+    m.DOMAIN(ds, method="border")
+    assert m.domain_polygon_latlon is outline
+    plt.close("all")
+
+
+def test_grid_and_earth_relative_vectors():
+    """Vectors on an HRRR-like grid are rotated on the GRIB spherical earth"""
+    from toolbox.cartopy_tools import grid_and_earth_relative_vectors
+
+    attrs = dict(
+        GRIB_gridType="lambert",
+        GRIB_LaDInDegrees=38.5,
+        GRIB_LoVInDegrees=262.5,
+        GRIB_Latin1InDegrees=38.5,
+        GRIB_Latin2InDegrees=38.5,
+        GRIB_shapeOfTheEarth=6,
+    )
+    crs = ccrs.LambertConformal(
+        central_latitude=38.5,
+        central_longitude=262.5,
+        standard_parallels=(38.5, 38.5),
+        globe=ccrs.Globe(
+            ellipse="sphere", semimajor_axis=6371229, semiminor_axis=6371229
+        ),
+    )
+    x, y = np.meshgrid(-2_000_000 + 100_000 * np.arange(41), 100_000 * np.arange(21))
+    lonlat = ccrs.PlateCarree().transform_points(crs, x, y)
+    ds = xr.Dataset(
+        {
+            "u10": (("y", "x"), np.ones(x.shape), attrs),
+            "v10": (("y", "x"), np.zeros(x.shape), attrs),
+        },
+        coords={
+            "latitude": (("y", "x"), lonlat[..., 1]),
+            "longitude": (("y", "x"), lonlat[..., 0]),
+        },
+    )
+    grid, earth = grid_and_earth_relative_vectors(ds)
+
+    # The grid-relative coordinates are the grid's projection x and y
+    np.testing.assert_allclose(grid.longitude, x, atol=1e-3)
+    np.testing.assert_allclose(grid.latitude, y, atol=1e-3)
+
+    # A grid-relative wind from the west points n * (lon - LoV) clockwise
+    # of east. Cartopy expresses it in PlateCarree (degrees) space, where
+    # the east component is stretched by 1 / cos(lat).
+    lon, lat = np.deg2rad(lonlat[..., 0] + 97.5), np.deg2rad(lonlat[..., 1])
+    angle = np.sin(np.deg2rad(38.5)) * lon
+    u, v = np.cos(angle) / np.cos(lat), -np.sin(angle)
+    speed = np.hypot(u, v)
+    np.testing.assert_allclose(earth.u10, u / speed, atol=1e-5)
+    np.testing.assert_allclose(earth.v10, v / speed, atol=1e-5)
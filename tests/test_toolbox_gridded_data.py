@@ -0,0 +1,666 @@
+"""
+Tests for toolbox.gridded_data
+"""
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import toolbox.cartopy_tools
+import toolbox.gridded_data
+
+
+def _sample_grid():
+    """A small curvilinear-looking grid with 2-D latitude and longitude."""
+    lon, lat = np.meshgrid(np.arange(-120, -100, 0.5), np.arange(30, 45, 0.5))
+    ds = xr.Dataset(
+        {"t2m": (("time", "y", "x"), np.random.rand(3, *lat.shape))},
+        coords={
+            "time": np.arange(3),
+            "latitude": (("y", "x"), lat),
+            "longitude": (("y", "x"), lon),
+        },
+    )
+    return ds
+
+
+def _lambert_grid():
+    """A 3 km grid that is regular in a Lambert conformal projection."""
+    import cartopy.crs as ccrs
+
+    attrs = dict(
+        GRIB_gridType="lambert",
+        GRIB_LaDInDegrees=38.5,
+        GRIB_LoVInDegrees=262.5,
+        GRIB_Latin1InDegrees=38.5,
+        GRIB_Latin2InDegrees=38.5,
+        GRIB_shapeOfTheEarth=6,
+    )
+    crs = ccrs.LambertConformal(
+        central_latitude=38.5,
+        central_longitude=262.5,
+        standard_parallels=(38.5, 38.5),
+        globe=ccrs.Globe(
+            ellipse="sphere", semimajor_axis=6371229, semiminor_axis=6371229
+        ),
+    )
+    x, y = np.meshgrid(-500_000 + 3000 * np.arange(300), 3000 * np.arange(200))
+    lonlat = ccrs.PlateCarree().transform_points(crs, x, y)
+    ds = xr.Dataset(
+        {"t": (("y", "x"), x / 1000.0, attrs)},
+        coords={
+            "latitude": (("y", "x"), lonlat[..., 1]),
+            "longitude": (("y", "x"), lonlat[..., 0] % 360),
+        },
+    )
+    return ds, crs
+
+
+def test_pluck_points():
+    """Test pluck_points matches the nearest grid point"""
+    ds = _sample_grid()
+    points = [(-111.9, 40.1), (-110.2, 35.3), (-60, 10)]
+
+    with pytest.warns(UserWarning, match="Dropped 1 point"):
+        p = toolbox.gridded_data.pluck_points(
+            ds, points, names=["a", "b", "c"], dist_thresh=50_000
+        )
+
+    # The last point is outside the domain and should be dropped.
+    assert list(p.point.data) == ["a", "b"]
+    assert np.allclose(p.longitude, [-112, -110])
+    assert np.allclose(p.latitude, [40, 35.5])
+    assert p.attrs["x_index"][:2] == [16, 20]
+    assert p.attrs["y_index"][:2] == [20, 11]
+    assert p.t2m.dims == ("point", "time")
+
+
+def test_pluck_points_dateline():
+    """Matching works across the dateline and with [0, 360] longitude"""
+    lon, lat = np.meshgrid(np.arange(170, 190, 1.0), np.arange(-5, 5, 1.0))
+    ds = xr.Dataset(
+        coords={"latitude": (("y", "x"), lat), "longitude": (("y", "x"), lon)}
+    )
+    p = toolbox.gridded_data.pluck_points(ds, [(-179.1, 0.2)], dist_thresh=50_000)
+    assert p.attrs["x_index"] == [11]
+    assert p.attrs["y_index"] == [5]
+    assert p.distance.item() < 30_000
+
+
+def test_point_index_save_load(tmp_path):
+    """A saved PointIndex plucks the same values as a fresh search"""
+    ds = _sample_grid()
+    points = [(-111.9, 40.1), (-110.2, 35.3)]
+    idx = toolbox.gridded_data.PointIndex.from_dataset(ds, points, names=["a", "b"])
+
+    expected = toolbox.gridded_data.pluck_points(ds, points, dist_thresh=50_000)
+    for f in ["index.npz", "index.parquet"]:
+        loaded = toolbox.gridded_data.PointIndex.load(idx.save(tmp_path / f))
+        assert loaded.fingerprint == idx.fingerprint
+        p = toolbox.gridded_data.pluck_points(ds, index=loaded, dist_thresh=50_000)
+        assert list(p.point.data) == ["a", "b"]
+        np.testing.assert_array_equal(p.t2m, expected.t2m)
+
+    # The index refuses to be used on a different grid.
+    with pytest.raises(ValueError):
+        toolbox.gridded_data.pluck_points(ds.isel(x=slice(1, None)), index=idx)
+
+
+@pytest.mark.parametrize("method", ["bilinear", "idw"])
+def test_pluck_points_interpolate(method):
+    """Interpolation methods reproduce a smooth field between grid points"""
+    ds = _sample_grid()
+    ds["f"] = 2 * ds.longitude + 3 * ds.latitude
+    points = [(-111.9, 40.1), (-110.2, 35.3)]
+    expected = [2 * lon + 3 * lat for lon, lat in points]
+
+    p = toolbox.gridded_data.pluck_points(ds, points, method=method, dist_thresh=50_000)
+    assert p.t2m.dims == ("point", "time")
+    np.testing.assert_allclose(p.longitude, [-111.9, -110.2])
+    np.testing.assert_allclose(p.f, expected, atol=0.5 if method == "idw" else 1e-2)
+
+
+def test_pluck_points_rectilinear():
+    """1-D latitude (descending) and longitude [0, 360] coordinates"""
+    lat = np.arange(90, -90.1, -0.5)
+    lon = np.arange(0, 360, 0.5)
+    ds = xr.Dataset(
+        {"f": (("latitude", "longitude"), np.add.outer(lat, lon / 1000))},
+        coords={"latitude": lat, "longitude": lon},
+    )
+    points = [(-111.9, 40.1), (179.9, -10.3), (-0.1, 0)]
+
+    p = toolbox.gridded_data.pluck_points(ds, points, dist_thresh=50_000)
+    np.testing.assert_allclose(p.latitude, [40, -10.5, 0])
+    np.testing.assert_allclose(p.longitude, [-112, -180, 0])
+    assert p.attrs["longitude_index"] == [496, 360, 0]
+
+    # The same points on the 2-D grid are matched to the same grid points
+    lon2d, lat2d = np.meshgrid(lon, lat)
+    idx = toolbox.gridded_data.PointIndex(lat2d, lon2d, points)
+    assert list(idx.indices["x"]) == p.attrs["longitude_index"]
+    assert list(idx.indices["y"]) == p.attrs["latitude_index"]
+
+    p = toolbox.gridded_data.pluck_points(
+        ds, points, method="bilinear", dist_thresh=50_000
+    )
+    np.testing.assert_allclose(p.f[:2], [40.1 + 248.1 / 1000, -10.3 + 179.9 / 1000])
+
+
+def test_pluck_points_lambert_crs():
+    """Index computed from a Lambert conformal projection matches the search"""
+    import cartopy.crs as ccrs
+
+    ds, crs = _lambert_grid()
+    points = [(-100.1, 39.2), (-102.5, 40.0), (-98.0, 41.5)]
+
+    expected = toolbox.gridded_data.pluck_points(ds, points)
+    p = toolbox.gridded_data.pluck_points(ds, points, crs="grib")
+    assert p.attrs["x_index"] == expected.attrs["x_index"]
+    assert p.attrs["y_index"] == expected.attrs["y_index"]
+
+    # Bilinear interpolation is exact for a field linear in projection x
+    p = toolbox.gridded_data.pluck_points(ds, points, method="bilinear", crs=crs)
+    px = crs.transform_points(ccrs.PlateCarree(), *np.array(points).T)[:, 0]
+    np.testing.assert_allclose(p.t, px / 1000, rtol=1e-6)
+
+
+def test_normalized_longitude_is_cached_and_read_only():
+    """Longitude is wrapped once per grid and the caller's data is untouched"""
+    lon, lat = np.meshgrid(np.arange(200, 300, 0.5), np.arange(20, 50, 0.5))
+    ds = xr.Dataset(
+        coords={"latitude": (("y", "x"), lat), "longitude": (("y", "x"), lon)}
+    )
+
+    a = toolbox.gridded_data._normalized_longitude(ds.longitude)
+    b = toolbox.gridded_data._normalized_longitude(ds.longitude)
+    assert a is b
+    assert not a.flags.writeable
+    assert a.min() == -160
+
+    p = toolbox.gridded_data.pluck_points(ds, [(-111.9, 40.1)], dist_thresh=50_000)
+    np.testing.assert_allclose(p.longitude, [-112])
+    assert ds.longitude.min() == 200
+
+
+def test_pluck_points_chunked(tmp_path):
+    """Chunk-grouped extraction gives the same values as pluck_points"""
+    pytest.importorskip("dask")
+    ds = _sample_grid().chunk({"time": 1, "y": 10, "x": 10})
+    points = [(-111.9, 40.1), (-110.2, 35.3), (-119.6, 30.1), (-111.8, 40.2)]
+
+    expected = toolbox.gridded_data.pluck_points(ds, points, dist_thresh=50_000)
+    p = toolbox.gridded_data.pluck_points_chunked(ds, points, dist_thresh=50_000)
+    assert p.t2m.dims == ("time", "point")
+    np.testing.assert_allclose(p.t2m, expected.t2m.T)
+
+    pytest.importorskip("zarr")
+    p = toolbox.gridded_data.pluck_points_chunked(
+        ds, points, dist_thresh=50_000, store=tmp_path / "points.zarr"
+    )
+    np.testing.assert_allclose(p.t2m, expected.t2m.T)
+
+
+def test_pluck_timeseries(tmp_path):
+    """Points from many files are written to a restartable Parquet store"""
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    files = []
+    for t in range(3):
+        f = tmp_path / f"file_{t}.nc"
+        _sample_grid().isel(time=[t]).to_netcdf(f)
+        files.append(f)
+
+    points = [(-111.9, 40.1), (-110.2, 35.3)]
+    kwargs = dict(names=["a", "b"], dist_thresh=50_000, verbose=False)
+    store = toolbox.gridded_data.pluck_timeseries(
+        files[:2], points, tmp_path / "store", **kwargs
+    )
+    first = {f: f.stat().st_mtime_ns for f in store.iterdir()}
+    store = toolbox.gridded_data.pluck_timeseries(files, points, store, **kwargs)
+
+    # Files already done are not processed again
+    assert len(list(store.iterdir())) == 3
+    assert all(f.stat().st_mtime_ns == mtime for f, mtime in first.items())
+
+    df = pd.read_parquet(store).sort_values(["time", "point"])
+    assert len(df) == 6
+    assert list(df.point[:2]) == ["a", "b"]
+
+
+def test_pluck_neighborhood():
+    """Neighborhood statistics match a brute-force distance mask"""
+    ds = _sample_grid()
+    points = [(-111.9, 40.1), (-110.2, 35.3)]
+    out = toolbox.gridded_data.pluck_neighborhood(
+        ds, points, radius_km=60, names=["a", "b"]
+    )
+
+    for name, (lon, lat) in zip(["a", "b"], points):
+        d = toolbox.gridded_data._haversine(lon, lat, ds.longitude, ds.latitude)
+        values = ds.t2m.where(d <= 60_000)
+        np.testing.assert_allclose(out.t2m_max.sel(point=name), values.max(["y", "x"]))
+        np.testing.assert_allclose(
+            out.t2m_mean.sel(point=name), values.mean(["y", "x"])
+        )
+        np.testing.assert_array_equal(
+            out.t2m_count.sel(point=name), values.count(["y", "x"])
+        )
+
+
+@pytest.mark.parametrize("method", ["nearest", "bilinear"])
+def test_regridder(tmp_path, method):
+    """Regridding to a lat/lon grid with saved sparse weights"""
+    ds = _sample_grid()
+    ds["f"] = 2 * ds.longitude + 3 * ds.latitude
+    target = dict(
+        latitude=np.arange(28, 47, 0.25), longitude=np.arange(-121, -99, 0.25)
+    )
+
+    regridder = toolbox.gridded_data.Regridder(ds, target, method=method)
+    out = regridder(ds)
+    assert out.t2m.dims == ("time", "latitude", "longitude")
+    assert out.t2m.shape == (3, 76, 88)
+
+    # Target points outside the source grid are NaN
+    assert np.isnan(out.f.sel(latitude=28, longitude=-110))
+    inside = out.f.sel(latitude=slice(31, 44), longitude=slice(-119, -101))
+    expected = 3 * inside.latitude + 2 * inside.longitude
+    np.testing.assert_allclose(
+        inside, expected, atol=1.25 if method == "nearest" else 1e-2
+    )
+
+    loaded = toolbox.gridded_data.Regridder.load(regridder.save(tmp_path / "w.npz"))
+    np.testing.assert_array_equal(loaded(ds.t2m), out.t2m)
+
+    # The weights refuse a different grid of the same shape
+    shifted = ds.assign_coords(longitude=ds.longitude + 1)
+    with pytest.raises(ValueError, match="built for grid"):
+        loaded(shifted)
+
+
+def test_regridder_grib_crs():
+    """The projection of the source grid can come from its GRIB attributes"""
+    ds, _ = _lambert_grid()
+    target = dict(latitude=np.arange(39, 41, 0.5), longitude=np.arange(-102, -99, 0.5))
+    expected = toolbox.gridded_data.Regridder(ds, target)(ds.t)
+    out = toolbox.gridded_data.Regridder(ds.t, target, crs="grib")(ds.t)
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_mask_polygon():
+    """Points outside the polygon are masked and the grid is cropped"""
+    from shapely.geometry import GeometryCollection, box
+
+    ds = _sample_grid()
+    polygon = box(-115.2, 33.2, -110.2, 40.2)
+    out = toolbox.gridded_data.mask_polygon(ds, polygon)
+
+    assert out.t2m.shape == (3, 14, 10)
+    assert float(out.longitude.min()) == -115 and float(out.latitude.max()) == 40
+    assert out.t2m.notnull().all()
+
+    # The mask is cached for the grid and polygon
+    a = toolbox.gridded_data._polygon_mask(ds.latitude, ds.longitude, polygon)
+    b = toolbox.gridded_data._polygon_mask(ds.latitude, ds.longitude, polygon)
+    assert a is b
+
+    # A GeometryCollection on a [0, 360] grid
+    ds360 = ds.assign_coords(longitude=ds.longitude % 360)
+    shapes = GeometryCollection([box(-115, 33, -110, 40), box(-111, 30, -100, 31)])
+    full = toolbox.gridded_data.mask_polygon(ds360, shapes, crop=False)
+    assert full.t2m.shape == ds.t2m.shape
+    assert int(full.t2m.isel(time=0).count()) == 11 * 15 + 22 * 3
+
+    # A rectilinear grid with 1-D latitude and longitude
+    ds1d = xr.Dataset(
+        {"t2m": (("latitude", "longitude"), np.random.rand(81, 121))},
+        coords={
+            "latitude": np.arange(25, 45.01, 0.25),
+            "longitude": np.arange(-120, -89.99, 0.25),
+        },
+    )
+    out = toolbox.gridded_data.mask_polygon(ds1d, box(-108, 32, -104, 36))
+    assert out.t2m.shape == (17, 17)
+    assert out.t2m.notnull().all()
+    assert float(out.longitude.min()) == -108 and float(out.latitude.max()) == 36
+
+
+def test_zonal_statistics():
+    """Area-weighted statistics for several regions match a direct calculation"""
+    from shapely.geometry import box
+
+    ds = _sample_grid()
+    regions = {
+        # Exactly covers cells centered on lon -115 to -110, lat 35 to 40
+        "a": box(-115.25, 34.75, -109.75, 40.25),
+        # Covers half of each cell along its edges
+        "b": box(-105, 31, -103, 33),
+    }
+    zonal = toolbox.gridded_data.ZonalStatistics(ds, regions)
+    out = zonal(ds)
+    assert out.t2m_mean.dims == ("region", "time")
+
+    a = ds.t2m.where(
+        (ds.longitude >= -115)
+        & (ds.longitude <= -110)
+        & (ds.latitude >= 35)
+        & (ds.latitude <= 40)
+    )
+    w = np.cos(np.deg2rad(ds.latitude))
+    np.testing.assert_allclose(
+        out.t2m_mean.sel(region="a"), a.weighted(w.fillna(0)).mean(["y", "x"])
+    )
+    np.testing.assert_allclose(out.t2m_max.sel(region="a"), a.max(["y", "x"]))
+    np.testing.assert_allclose(out.t2m_sum.sel(region="a"), a.sum(["y", "x"]))
+
+    # Cells on the edge of region b count half, corners a quarter
+    b = ds.t2m.where(
+        (ds.longitude >= -105)
+        & (ds.longitude <= -103)
+        & (ds.latitude >= 31)
+        & (ds.latitude <= 33)
+    )
+    edge = (np.abs(ds.longitude + 104) == 1).astype(int) + (
+        np.abs(ds.latitude - 32) == 1
+    ).astype(int)
+    np.testing.assert_allclose(
+        out.t2m_sum.sel(region="b"), (b * 0.5**edge).sum(["y", "x"])
+    )
+
+    # Data with the same shape on a different grid is refused
+    shifted = ds.assign_coords(longitude=ds.longitude + 1)
+    with pytest.raises(ValueError, match="built for grid"):
+        zonal(shifted)
+
+
+def test_border_and_corners_nd():
+    """border and corners work on stacked and dask-backed arrays"""
+    x, y = np.meshgrid(range(1, 6), range(5))
+    array = x * y
+    array[0, 0] = 999
+    np.testing.assert_array_equal(
+        toolbox.gridded_data.border(array, corner=2, direction="ccw"),
+        [20, 15, 10, 5, 0, 0, 0, 0, 999, 1, 2, 3, 4, 8, 12, 16, 20],
+    )
+
+    # A moving nest: the outline for each time step
+    stacked = np.stack([array, array + 1, array + 2])
+    b = toolbox.gridded_data.border(stacked, corner=1)
+    assert b.shape == (3, 17)
+    np.testing.assert_array_equal(
+        b[2], toolbox.gridded_data.border(array, corner=1) + 2
+    )
+    c = toolbox.gridded_data.corners(stacked, direction="ccw")
+    np.testing.assert_array_equal(c[:, 0], [999, 1000, 1001])
+
+    da = pytest.importorskip("dask.array")
+    lazy = da.from_array(stacked, chunks=(1, 2, 2))
+    b_lazy = toolbox.gridded_data.border(lazy, corner=1)
+    assert isinstance(b_lazy, da.Array)
+    np.testing.assert_array_equal(b_lazy.compute(), b)
+    np.testing.assert_array_equal(
+        toolbox.gridded_data.corners(lazy, direction="ccw").compute(), c
+    )
+
+
+def test_cross_section():
+    """Samples follow the great circle through the waypoints"""
+    ds = _sample_grid()
+    ds["f"] = 2 * ds.longitude + 3 * ds.latitude
+    waypoints = [(-118, 32), (-112, 40), (-104, 41)]
+
+    xs = toolbox.gridded_data.cross_section(ds, waypoints, 50, method="bilinear")
+    assert xs.t2m.dims == ("time", "distance")
+    assert xs.distance.size == 50
+
+    # Ends at the waypoints and the distance is along the great circle
+    np.testing.assert_allclose(xs.longitude[[0, -1]], [-118, -104])
+    np.testing.assert_allclose(xs.latitude[[0, -1]], [32, 41])
+    hav = toolbox.gridded_data._haversine
+    total = hav(-118, 32, -112, 40) + hav(-112, 40, -104, 41)
+    np.testing.assert_allclose(xs.distance[-1], total)
+    np.testing.assert_allclose(np.diff(xs.distance), total / 49, rtol=1e-6)
+    np.testing.assert_allclose(xs.f, 2 * xs.longitude + 3 * xs.latitude, atol=1e-2)
+
+    # Samples off the grid are NaN
+    xs = toolbox.gridded_data.cross_section(ds, [(-110, 40), (-90, 40)], 21)
+    assert xs.t2m.isel(time=0).notnull().sum() == 11
+
+    # 'lat' and 'lon' coordinates work too
+    renamed = ds.rename(latitude="lat", longitude="lon")
+    xs = toolbox.gridded_data.cross_section(renamed.f, waypoints, 50, "bilinear")
+    np.testing.assert_allclose(xs, 2 * xs.longitude + 3 * xs.latitude, atol=1e-2)
+
+    # The projection can come from the GRIB attributes of a DataArray
+    ds, _ = _lambert_grid()
+    waypoints = [(-100.1, 39.2), (-98.0, 41.5)]
+    expected = toolbox.gridded_data.cross_section(ds.t, waypoints, 20)
+    xs = toolbox.gridded_data.cross_section(ds.t, waypoints, 20, crs="grib")
+    np.testing.assert_array_equal(xs, expected)
+
+
+def test_build_pyramid(tmp_path):
+    """Each level is the block mean of the full-resolution grid"""
+    ds = _sample_grid()
+    pyramid = toolbox.gridded_data.build_pyramid(ds.t2m, factors=(2, 4))
+    assert list(pyramid) == [1, 2, 4]
+    assert pyramid[4].shape == (3, 8, 10)
+    # The full-resolution level is not a copy, and the input isn't changed
+    assert np.shares_memory(pyramid[1].values, ds.t2m.values)
+    assert "pyramid_factor" not in ds.t2m.attrs
+    np.testing.assert_allclose(
+        pyramid[4].isel(y=1, x=2),
+        ds.t2m.isel(y=slice(4, 8), x=slice(8, 12)).mean(["y", "x"]),
+    )
+    np.testing.assert_allclose(pyramid[4].longitude[0, :2], [-119.25, -117.25])
+
+    # Partial edge blocks are averaged over the points that are there
+    odd = ds.t2m.isel(y=slice(0, 27))
+    pyramid = toolbox.gridded_data.build_pyramid(odd, factors=(2, 4))
+    np.testing.assert_allclose(
+        pyramid[4].isel(y=-1, x=0),
+        odd.isel(y=slice(24, 27), x=slice(0, 4)).mean(["y", "x"]),
+    )
+
+    # A pyramid without latitude and longitude has no resolution
+    bare = toolbox.gridded_data.build_pyramid(
+        ds.t2m.drop_vars(["latitude", "longitude"])
+    )
+    with pytest.raises(ValueError, match="pyramid_resolution"):
+        toolbox.gridded_data.pyramid_level(bare, resolution=1)
+
+    pytest.importorskip("zarr")
+    store = tmp_path / "pyramid.zarr"
+    expected = toolbox.gridded_data.build_pyramid(ds.t2m, factors=(2, 4, 8))
+    toolbox.gridded_data.build_pyramid(ds.t2m, factors=(2, 4, 8), store=store)
+    pyramid = toolbox.gridded_data.open_pyramid(store)
+    assert list(pyramid) == [2, 4, 8]
+    np.testing.assert_allclose(pyramid[8].t2m, expected[8])
+
+    # Grid spacing is about 55 km, so 4x is about 222 km
+    level = toolbox.gridded_data.pyramid_level(pyramid, resolution=300_000)
+    assert level.attrs["pyramid_factor"] == 4
+    level = toolbox.gridded_data.pyramid_level(pyramid, resolution=1)
+    assert level.attrs["pyramid_factor"] == 2
+
+
+def test_grid_registry(tmp_path):
+    """Registered grids open with memory-mapped coordinates"""
+    ds = _sample_grid()
+    ds.t2m.attrs.update(GRIB_gridType="regular_ll", GRIB_Nx=40, GRIB_units="K")
+    toolbox.gridded_data.register_grid(ds, "sample", cache_dir=tmp_path)
+    assert toolbox.gridded_data.registered_grids(cache_dir=tmp_path) == ["sample"]
+
+    grid = toolbox.gridded_data.open_grid("sample", cache_dir=tmp_path)
+    assert isinstance(grid.latitude.values.base, np.memmap)
+    assert not grid.latitude.values.flags.writeable
+    np.testing.assert_array_equal(grid.latitude, ds.latitude)
+    np.testing.assert_array_equal(
+        grid.border_longitude, toolbox.gridded_data.border(ds.longitude)
+    )
+    assert grid.border_latitude.attrs == {"GRIB_gridType": "regular_ll", "GRIB_Nx": 40}
+
+    # The saved unit-sphere coordinates go through the size-limited cache
+    for i in range(toolbox.gridded_data._CACHE_SIZE):
+        toolbox.gridded_data._cached(("filler", i), lambda: None)
+    toolbox.gridded_data.open_grid("sample", cache_dir=tmp_path)
+    assert len(toolbox.gridded_data._CACHE) <= toolbox.gridded_data._CACHE_SIZE
+
+    points = [(-111.9, 40.1), (-110.2, 35.3)]
+    p = toolbox.gridded_data.pluck_points(grid, points, dist_thresh=50_000)
+    assert p.attrs["x_index"] == [16, 20]
+
+    # Coordinates are attached to data on the same grid without reading them
+    bare = ds.drop_vars(["latitude", "longitude"])
+    out = toolbox.gridded_data.use_registered_grid(bare, cache_dir=tmp_path)
+    np.testing.assert_array_equal(out.longitude, ds.longitude)
+    other = bare.isel(x=slice(1, None))
+    assert (
+        "latitude"
+        not in toolbox.gridded_data.use_registered_grid(
+            other, cache_dir=tmp_path
+        ).coords
+    )
+
+    # Without GRIB attributes, the same shape is not enough to match...
+    netcdf = xr.Dataset({"t2m": bare.t2m.copy(data=bare.t2m.values)})
+    netcdf.t2m.attrs = {}
+    out = toolbox.gridded_data.use_registered_grid(netcdf, cache_dir=tmp_path)
+    assert "latitude" not in out.coords
+    unrelated = netcdf.assign_coords(
+        latitude=ds.latitude - 20, longitude=ds.longitude + 50
+    )
+    out = toolbox.gridded_data.use_registered_grid(unrelated, cache_dir=tmp_path)
+    np.testing.assert_array_equal(out.latitude, ds.latitude - 20)
+    assert not isinstance(out.latitude.values.base, np.memmap)
+
+    # ...but the corner coordinates or an explicit name are
+    same = netcdf.assign_coords(latitude=ds.latitude, longitude=ds.longitude + 360)
+    out = toolbox.gridded_data.use_registered_grid(same, cache_dir=tmp_path)
+    assert isinstance(out.latitude.values.base, np.memmap)
+    out = toolbox.gridded_data.use_registered_grid(netcdf, "sample", cache_dir=tmp_path)
+    np.testing.assert_array_equal(out.longitude, ds.longitude)
+    with pytest.raises(ValueError):
+        toolbox.gridded_data.use_registered_grid(other, "sample", cache_dir=tmp_path)
+
+    with pytest.raises(FileNotFoundError):
+        toolbox.gridded_data.open_grid("nope", cache_dir=tmp_path)
+
+
+def test_grid_registry_polar_crs(tmp_path):
+    """A registered polar stereographic grid keeps what crs='grib' needs"""
+    import cartopy.crs as ccrs
+
+    attrs = dict(
+        GRIB_gridType="polar_stereographic",
+        GRIB_LaDInDegrees=60.0,
+        GRIB_orientationOfTheGridInDegrees=249.0,
+        GRIB_southPoleOnProjectionPlane=0,
+        GRIB_shapeOfTheEarth=6,
+    )
+    crs = toolbox.cartopy_tools._crs_from_grib_attrs(attrs)
+    x, y = np.meshgrid(
+        -1_000_000 + 10_000 * np.arange(150), -4_000_000 + 10_000 * np.arange(100)
+    )
+    lonlat = ccrs.PlateCarree().transform_points(crs, x, y)
+    ds = xr.Dataset(
+        {"t": (("y", "x"), x / 1000.0, attrs)},
+        coords={
+            "latitude": (("y", "x"), lonlat[..., 1]),
+            "longitude": (("y", "x"), lonlat[..., 0]),
+        },
+    )
+    toolbox.gridded_data.register_grid(ds, "polar", cache_dir=tmp_path)
+    grid = toolbox.gridded_data.open_grid("polar", cache_dir=tmp_path)
+
+    points = [(-110.0, 55.0), (-115.0, 57.0), (-104.0, 58.5)]
+    expected = toolbox.gridded_data.pluck_points(ds, points)
+    p = toolbox.gridded_data.pluck_points(grid, points, crs="grib")
+    assert p.attrs["x_index"] == expected.attrs["x_index"]
+    assert p.attrs["y_index"] == expected.attrs["y_index"]
+
+
+def test_pluck_points_table():
+    """The table output matches the Dataset and keeps integer dtypes"""
+    ds = _sample_grid()
+    ds["count"] = ds.t2m.astype(int) + 7
+    points = [(-111.9, 40.1), (-60, 10), (-110.2, 35.3)]
+
+    with pytest.warns(UserWarning, match="Dropped 1 point"):
+        p = toolbox.gridded_data.pluck_points(
+            ds, points, names=["a", "b", "c"], dist_thresh=50_000
+        )
+    assert p["count"].dtype == int
+
+    with pytest.warns(UserWarning, match="Dropped 1 point"):
+        df = toolbox.gridded_data.pluck_points(
+            ds, points, names=["a", "b", "c"], dist_thresh=50_000, output="table"
+        )
+    assert len(df) == 2 * 3
+    assert list(df.columns[:2]) == ["point", "time"]
+    assert df["count"].dtype == int
+    expected = p.to_dataframe().reset_index()
+    for col in ["point", "time", "t2m", "count", "distance", "latitude"]:
+        np.testing.assert_array_equal(df[col], expected[col])
+
+
+def test_border_polygon_dateline_and_pole():
+    """Domain polygons are valid across the antimeridian and around a pole"""
+    from shapely.geometry import Point
+
+    lon, lat = np.meshgrid(np.arange(160, 200, 1.0) % 360, np.arange(-10, 10, 1.0))
+    ds = xr.Dataset(
+        coords={"latitude": (("y", "x"), lat), "longitude": (("y", "x"), lon)}
+    )
+    polygon = toolbox.gridded_data.border_polygon(ds)
+    assert polygon.is_valid
+    assert polygon.bounds == (160, -10, 199, 9)
+    assert toolbox.gridded_data.border_polygon(ds) is polygon
+
+    split = toolbox.gridded_data.border_polygon(ds, antimeridian="split")
+    assert split.geom_type == "MultiPolygon"
+    assert split.bounds == (-180, -10, 180, 9)
+    assert split.contains(Point(-175, 0)) and split.contains(Point(175, 0))
+    np.testing.assert_allclose(split.area, polygon.area)
+
+    # A polar grid that contains the North Pole
+    x, y = np.meshgrid(np.linspace(-20, 20, 41), np.linspace(-20, 20, 41))
+    polar = xr.Dataset(
+        coords={
+            "latitude": (("y", "x"), 90 - np.hypot(x, y)),
+            "longitude": (("y", "x"), np.degrees(np.arctan2(y, x))),
+        }
+    )
+    polygon = toolbox.gridded_data.border_polygon(polar)
+    assert polygon.is_valid
+    assert polygon.contains(Point(-150, 85)) and not polygon.contains(Point(0, 65))
+
+    simple = toolbox.gridded_data.border_polygon(polar, tolerance=1)
+    assert len(simple.exterior.coords) < len(polygon.exterior.coords)
+
+
+def test_land_sea_mask(tmp_path):
+    """Land fraction from polygons, saved to disk for the grid"""
+    from shapely.geometry import Point, box
+
+    ds = _sample_grid()
+    land = [box(-115.1, 35.1, -110.1, 40.1), Point(-105, 32).buffer(0.99)]
+    mask = toolbox.gridded_data.land_sea_mask(ds, land=land, cache_dir=tmp_path)
+    assert mask.dims == ("y", "x")
+    assert mask.sum() == 10 * 10 + 9
+
+    # Fractional coverage approaches the area of the land (0.25 deg^2 cells)
+    fraction = toolbox.gridded_data.land_sea_mask(
+        ds, land=land, subsample=10, cache_dir=tmp_path
+    )
+    np.testing.assert_allclose(fraction.sum() * 0.25, 25 + np.pi * 0.99**2, rtol=1e-2)
+    assert fraction.max() == 1 and 0 < fraction.sel(x=10, y=10) < 1
+
+    # The second time is read from disk
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+    again = toolbox.gridded_data.land_sea_mask(
+        ds, land=land, subsample=10, cache_dir=tmp_path
+    )
+    assert isinstance(again.values.base, np.memmap)
+    np.testing.assert_array_equal(again, fraction)
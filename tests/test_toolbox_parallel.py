@@ -0,0 +1,224 @@
+"""
+Tests for toolbox.parallel
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from toolbox.parallel import EasyParallel, ParallelSession
+
+
+def add(q, w=3, e=3):
+    return q + w + e
+
+
+def slow_add(q, w=3, e=3):
+    time.sleep(0.01 * (q % 3))
+    return q + w + e
+
+
+def sleepy(q):
+    time.sleep(0.02)
+    return q
+
+
+def scale_rows(data, row, factor=1):
+    """Return a large array, and whether the input was read-only"""
+    if isinstance(data, xr.DataArray):
+        data = data.values
+    if row < 0:
+        raise ValueError("bad row")
+    return data[row] * factor + np.zeros((200_000,)), not data.flags.writeable
+
+
+def worker_info(q, w=0):
+    """The worker's process id, and whether the preloaded module is imported"""
+    return q + w, os.getpid(), "wave" in sys.modules
+
+
+def count_blocks(data, row):
+    """The number of shared memory blocks while a task runs"""
+    return len(_shm_blocks())
+
+
+def _shm_blocks():
+    """Names of the shared memory blocks (not semaphores) on Linux"""
+    if not os.path.isdir("/dev/shm"):
+        return set()
+    return {i for i in os.listdir("/dev/shm") if i.startswith("psm_")}
+
+
+def test_easy_parallel():
+    """The original methods return results in input order"""
+    ezpz = EasyParallel(add, ((1, 100), (2, 200), (3, 300), (4, 400)), e=0)
+    expected = [101, 202, 303, 404]
+    assert ezpz.sequential() == expected
+    assert ezpz.multithread2() == expected
+    assert ezpz.multipro(max_cpus=2) == expected
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes", "sequential"])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_iter(backend, ordered):
+    """iter yields every (index, result) pair"""
+    ezpz = EasyParallel(slow_add, list(range(20)), verbose=False, w=0, e=1)
+    results = list(ezpz.iter(backend=backend, ordered=ordered, max_workers=3))
+
+    assert sorted(results) == [(i + 1, i + 1) for i in range(20)]
+    if ordered:
+        assert [i for i, _ in results] == list(range(1, 21))
+    assert ezpz.info["type"] == f"iter ({backend})"
+
+
+def test_iter_bounded():
+    """Only a window of tasks is in progress, and stopping early stops the work"""
+    started = []
+    lock = threading.Lock()
+
+    def task(q):
+        with lock:
+            started.append(q)
+        time.sleep(0.01)
+        return q
+
+    ezpz = EasyParallel(task, list(range(1000)), verbose=False)
+    it = ezpz.iter(max_workers=2, window=4, ordered=False)
+    for n, _ in enumerate(it, start=1):
+        assert len(started) <= n + 4
+        if n == 10:
+            break
+    it.close()
+    assert len(started) < 20
+
+    # The window is in chunks for processes, and chunks of these tasks
+    # have at most 0.1 / 0.02 = 5 tasks
+    read = []
+
+    def inputs():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    it = EasyParallel(sleepy, inputs(), verbose=False).iter(
+        backend="processes", max_workers=2, window=1
+    )
+    assert next(it) == (1, 0)
+    assert len(read) <= 1 + 5
+    it.close()
+
+
+def test_generator_inputs(capsys):
+    """Any iterable of arguments works, and is only read as needed"""
+    read = []
+
+    def paths():
+        for i in range(200):
+            read.append(i)
+            yield f"file_{i}.txt"
+
+    ezpz = EasyParallel(len, paths())
+    assert ezpz.n is None
+    it = ezpz.iter(max_workers=2, window=4)
+    first = [next(it) for _ in range(5)]
+    assert first[0] == (1, len("file_0.txt"))
+    assert len(read) <= 5 + 4
+    it.close()
+
+    out = capsys.readouterr().out
+    assert "unknown number of" in out
+    assert "completed task [5]" in out
+
+    results = EasyParallel(len, (f"file_{i}.txt" for i in range(50))).multithread(
+        max_threads=4
+    )
+    assert sorted(results) == sorted(len(f"file_{i}.txt") for i in range(50))
+
+    # multithread2 also reads the inputs only as threads are ready
+    read.clear()
+    ahead = []
+
+    def task(path):
+        ahead.append(len(read) - int(path[5:-4]))
+        return len(path)
+
+    results = EasyParallel(task, paths()).multithread2(max_threads=2)
+    assert results == [len(f"file_{i}.txt") for i in range(200)]
+    assert max(ahead) <= 2 * 2
+
+
+def test_multipro_chunks():
+    """Tiny tasks are sent to the processes in larger chunks"""
+    ezpz = EasyParallel(add, range(2000), verbose=False, w=1, e=1)
+    assert ezpz.multipro(max_cpus=2) == [i + 2 for i in range(2000)]
+    assert ezpz.info["chunksize"] > 1
+    assert ezpz.info["tasks_per_second"] > 0
+
+    results = dict(ezpz.iter(backend="processes", ordered=False, max_workers=2))
+    assert results == {i + 1: i + 2 for i in range(2000)}
+    assert "tasks_per_second" in ezpz.info
+
+
+def test_shared_memory():
+    """Large arrays go through shared memory, which is always freed"""
+    data = np.random.rand(4, 200_000)  # 6.4 MB
+    before = _shm_blocks()
+
+    args = [(data, i) for i in range(4)] + [(xr.DataArray(data), 1)]
+    ezpz = EasyParallel(scale_rows, args, verbose=False, factor=2)
+    results = ezpz.multipro(max_cpus=2, shared_memory=True)
+    for (array, readonly), (_, i) in zip(results, args):
+        assert readonly
+        assert array.flags.writeable
+        np.testing.assert_array_equal(array, data[i] * 2)
+    assert _shm_blocks() == before
+
+    # An array passed with every task is put in shared memory once
+    ezpz = EasyParallel(count_blocks, [(data, i) for i in range(20)], verbose=False)
+    assert set(ezpz.multipro(max_cpus=2, shared_memory=True)) == {len(before) + 1}
+    assert _shm_blocks() == before
+
+    ezpz = EasyParallel(scale_rows, [(data, 0), (data, -1)], verbose=False)
+    with pytest.raises(ValueError, match="bad row"):
+        ezpz.multipro(max_cpus=2, shared_memory=True)
+    assert _shm_blocks() == before
+
+
+def test_parallel_session():
+    """Warm workers are reused across calls, and recycled if asked"""
+    # Workers are forked from a server that has imported this module
+    preload = ["wave", __name__]
+    with ParallelSession(
+        max_workers=2, start_method="forkserver", preload=preload
+    ) as session:
+        pids = set()
+        for w in (1, 5):
+            results = EasyParallel(worker_info, range(6), verbose=False, w=w).multipro()
+            assert [r[0] for r in results] == [q + w for q in range(6)]
+            assert all(r[2] for r in results)
+            pids |= {r[1] for r in results}
+        # Both calls used the same (at most two) workers
+        assert len(pids) <= 2
+        assert session.processes is not None
+
+        results = EasyParallel(worker_info, range(6), verbose=False).multithread2()
+        assert {r[1] for r in results} == {os.getpid()}
+    assert session._processes is None
+
+    session = ParallelSession(
+        max_workers=1, start_method="forkserver", preload=preload, maxtasksperchild=1
+    )
+    results = EasyParallel(worker_info, range(3), verbose=False).multipro(
+        session=session
+    )
+    session.close()
+    # A new worker for every chunk (of one task)
+    assert len({r[1] for r in results}) == 3
+
+    with pytest.raises(ValueError):
+        ParallelSession(start_method="fork", maxtasksperchild=1)
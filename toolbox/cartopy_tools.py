@@ -42,8 +42,9 @@ import numpy as np
 import pandas as pd
 import pyproj
 import requests
-import xarray as xr
+import shapely
 import shapely.geometry as sgeom
+import xarray as xr
 from mpl_toolkits.axes_grid1.inset_locator import InsetPosition
 from cartopy.io import shapereader
 from functools import partial
@@ -800,6 +801,7 @@ class EasyMap:
         top="ice",
         kind="pcolormesh",
         extent=None,
+        land_mask=None,
         **kwargs,
     ):
         """
@@ -824,6 +826,10 @@ class EasyMap:
             - by extent (len==4 tuple/list), e.g. `[-130, -100, 20, 50]`
             - by xarray.Dataset (must have coordinates 'lat' and 'lon')
               TODO: Currently does not allow domains that cross -180 lon.
+        land_mask : None or {'10m', '50m', '110m'}
+            If None, land is where the elevation is 0 and above (crude
+            estimation). Otherwise, use Natural Earth land polygons at
+            this scale (see ``gridded_data.land_sea_mask``).
         """
         da = get_ETOPO1(top=top, coarsen=coarsen)
 
@@ -855,8 +861,14 @@ class EasyMap:
                 & (da.lat <= extent[3])
             )
 
-        # Get "land" points (elevation is 0 and above, crude estimation)
-        da = da.where(da >= 0)
+        if land_mask:
+            # Get "land" points from Natural Earth land polygons
+            from toolbox.gridded_data import land_sea_mask
+
+            da = da.where(land_sea_mask(da, land_mask, x="lon", y="lat") >= 0.5)
+        else:
+            # Get "land" points (elevation is 0 and above, crude estimation)
+            da = da.where(da >= 0)
 
         kwargs.setdefault("zorder", 0)
         kwargs.setdefault("cmap", "YlOrBr")
@@ -881,6 +893,7 @@ class EasyMap:
         top="ice",
         kind="pcolormesh",
         extent=None,
+        land_mask=None,
         **kwargs,
     ):
         """
@@ -905,6 +918,10 @@ class EasyMap:
             - by extent (len==4 tuple/list), e.g. `[-130, -100, 20, 50]`
             - by xarray.Dataset (must have coordinates 'lat' and 'lon')
               TODO: Currently does not allow domains that cross -180 lon.
+        land_mask : None or {'10m', '50m', '110m'}
+            If None, land is where the elevation is 0 and above (crude
+            estimation). Otherwise, use Natural Earth land polygons at
+            this scale (see ``gridded_data.land_sea_mask``).
         """
         da = get_ETOPO1(top=top, coarsen=coarsen)
 
@@ -936,8 +953,14 @@ class EasyMap:
                 & (da.lat <= extent[3])
             )
 
-        # Get "water" points (elevation is 0 and above, crude estimation)
-        da = da.where(da <= 0)
+        if land_mask:
+            # Get "water" points from Natural Earth land polygons
+            from toolbox.gridded_data import land_sea_mask
+
+            da = da.where(land_sea_mask(da, land_mask, x="lon", y="lat") < 0.5)
+        else:
+            # Get "water" points (elevation is 0 and above, crude estimation)
+            da = da.where(da <= 0)
 
         kwargs.setdefault("zorder", 0)
         kwargs.setdefault("cmap", "Blues_r")
@@ -1182,6 +1205,7 @@ class EasyMap:
         text=None,
         method="cutout",
         facealpha=0.25,
+        tolerance=None,
         text_kwargs={},
         **kwargs,
     ):
@@ -1208,6 +1232,11 @@ class EasyMap:
         facealpha : float between 0 and 1
             Since there isn't a "facealpha" attribute for plotting,
             this will be it.
+        tolerance : None or float
+            If given, simplify the domain outline to this tolerance
+            (degrees) so the cutout is much faster to compute. The
+            outline is cached, so drawing the same domain again is cheap
+            (see ``toolbox.gridded_data.border_polygon``).
         polygon_only : bool
             - True: Only return the polygons and don't plot on axes.
         """
@@ -1235,36 +1264,28 @@ class EasyMap:
             raise ValueError("Review your input")
         ####################################################################
 
-        # Path of array outside border starting from the lower left corner
-        # and going around the array counter-clockwise.
-        outside = (
-            list(zip(LON[0, :], LAT[0, :]))
-            + list(zip(LON[:, -1], LAT[:, -1]))
-            + list(zip(LON[-1, ::-1], LAT[-1, ::-1]))
-            + list(zip(LON[::-1, 0], LAT[::-1, 0]))
-        )
-        outside = np.array(outside)
+        # Path of array outside border starting from the first element
+        # and going around the array.
+        from toolbox.gridded_data import _outline_polygon, border
+
+        outside = np.column_stack([border(LON), border(LAT)])
 
         ## Polygon in latlon coordinates
         ## -----------------------------
-        x = outside[:, 0]
-        y = outside[:, 1]
-        domain_polygon_latlon = sgeom.Polygon(zip(x, y))
+        # Cached, and split at the antimeridian (and closed at a pole)
+        domain_polygon_latlon = _outline_polygon(
+            outside[:, 0], outside[:, 1], antimeridian="split", tolerance=tolerance
+        )
 
         ## Polygon in projection coordinates
         ## ----------------------------------
-        transform = self.ax.projection.transform_points(pc, x, y)
-
-        # Remove any points that run off the projection map (i.e., point's value is `inf`).
-        transform = transform[~np.isinf(transform).any(axis=1)]
-
-        # These are the x and y points we need to create the Polygon for
-        x = transform[:, 0]
-        y = transform[:, 1]
+        # Cartopy cuts the polygon where it runs off the projection
+        domain_polygon = self.ax.projection.project_geometry(domain_polygon_latlon, pc)
+        if not domain_polygon.is_valid:
+            domain_polygon = shapely.make_valid(domain_polygon)
+        # Join the pieces that were split at the antimeridian
+        domain_polygon = shapely.union_all(domain_polygon)
 
-        domain_polygon = sgeom.Polygon(
-            zip(x, y)
-        )  # This is the boundary of the LAT/LON array supplied.
         global_polygon = (
             self.ax.projection.domain
         )  # This is the projection globe polygon
@@ -1289,7 +1310,7 @@ class EasyMap:
         elif method == "border":
             kwargs.setdefault("facecolor", "none")
             artist = self.ax.add_feature(
-                feature.ShapelyFeature([domain_polygon.exterior], self.ax.projection),
+                feature.ShapelyFeature([domain_polygon.boundary], self.ax.projection),
                 **kwargs,
             )
 
@@ -1355,6 +1376,53 @@ def point_radius_polygon(lon, lat, radius):
     return sgeom.Polygon(points)
 
 
+def _crs_from_grib_attrs(var_attrs):
+    """
+    Return the cartopy projection described by a variable's GRIB attributes.
+
+    This works if the dataset was opened with
+    ``xarray.open_dataset('file.grib2', engine='cfgrib')`` and the grid is
+    a Lambert conformal (e.g., HRRR, NAM) or polar stereographic grid.
+
+    Parameters
+    ----------
+    var_attrs : dict
+        The attributes of a variable read by cfgrib (i.e., ``ds[var].attrs``).
+    """
+    # GRIB shapeOfTheEarth=6 is a sphere with radius 6,371,229 m (NCEP models)
+    if var_attrs.get("GRIB_shapeOfTheEarth") == 6:
+        globe = ccrs.Globe(
+            ellipse="sphere", semimajor_axis=6371229, semiminor_axis=6371229
+        )
+    else:
+        globe = None
+
+    if var_attrs["GRIB_gridType"] == "lambert":
+        lc_HRRR_kwargs = {
+            "central_latitude": var_attrs["GRIB_LaDInDegrees"],
+            "central_longitude": var_attrs["GRIB_LoVInDegrees"],
+            "standard_parallels": (
+                var_attrs["GRIB_Latin1InDegrees"],
+                var_attrs["GRIB_Latin2InDegrees"],
+            ),
+            "globe": globe,
+        }
+        return ccrs.LambertConformal(**lc_HRRR_kwargs)
+    elif var_attrs["GRIB_gridType"] == "polar_stereographic":
+        south = var_attrs.get("GRIB_southPoleOnProjectionPlane", 0) == 1
+        return ccrs.Stereographic(
+            central_latitude=-90 if south else 90,
+            central_longitude=var_attrs["GRIB_orientationOfTheGridInDegrees"],
+            true_scale_latitude=var_attrs["GRIB_LaDInDegrees"],
+            globe=globe,
+        )
+    else:
+        raise TypeError(
+            f"I'm not programmed to decode the {var_attrs['GRIB_gridType']} grid type yet.\
+        \nTry giving me a specific cartopy.projection object to `srcProj` kwarg."
+        )
+
+
 def grid_and_earth_relative_vectors(
     srcData,
     *,
@@ -1417,22 +1485,7 @@ def grid_and_earth_relative_vectors(
     # opened with xarray.open_dataset('file.grib2', engine='cfgrib') and
     # the dataset is in lambert projection.
     if srcProj is None:
-        var_attrs = srcData[u].attrs
-        if var_attrs["GRIB_gridType"] == "lambert":
-            lc_HRRR_kwargs = {
-                "central_latitude": var_attrs["GRIB_LaDInDegrees"],
-                "central_longitude": var_attrs["GRIB_LoVInDegrees"],
-                "standard_parallels": (
-                    var_attrs["GRIB_Latin1InDegrees"],
-                    var_attrs["GRIB_Latin2InDegrees"],
-                ),
-            }
-            srcProj = ccrs.LambertConformal(**lc_HRRR_kwargs)
-        else:
-            raise TypeError(
-                f"I'm not programmed to decode the {var_attrs['GRIB_gridType']} grid type yet.\
-            \nTry giving me a specific cartopy.projection object to `srcProj` kwarg."
-            )
+        srcProj = _crs_from_grib_attrs(srcData[u].attrs)
 
     # Transform Latitude and Longitude coordinate points (PlateCarree)
     # to the source projection coordinates. We need the lat/lon in the
@@ -10,12 +10,24 @@ Utilities for modifying gridded data
 
 """
 
+import hashlib
+import json
+import os
 import warnings
+from functools import partial
+from pathlib import Path
 
 import numpy as np
+import scipy.sparse
+import shapely
+import shapely.affinity
+import shapely.geometry
 import xarray as xr
+from scipy.spatial import cKDTree
 from shapely.geometry import Polygon
 
+R = 6373.0  # approximate radius of earth in km
+
 
 def _infer_interval_breaks(coords):
     """Copied from `toolbox.plot_helpers`"""
@@ -41,23 +53,1248 @@ def _to_180(lon):
     return lon
 
 
-def pluck_points(ds, points, names=None, dist_thresh=10_000, verbose=False):
+def _lonlat_to_xyz(lon, lat):
+    """
+    Convert longitude and latitude to 3-D coordinates on a unit sphere.
+
+    Euclidean distance between points on the unit sphere increases
+    monotonically with great-circle distance, so a nearest-neighbor
+    search in this space is correct everywhere on the globe, including
+    across the dateline and near the poles.
+
+    Parameters
+    ----------
+    lon, lat : array_like
+        Longitude and latitude in degrees. Any longitude convention
+        (e.g., [0, 360] or [-180, 180]) may be used.
+
+    Returns
+    -------
+    xyz : numpy.ndarray
+        Array with shape ``(..., 3)``.
+    """
+    lon = np.deg2rad(np.asarray(lon, dtype=float))
+    lat = np.deg2rad(np.asarray(lat, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack(
+        [cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+
+def _haversine(lon1, lat1, lon2, lat2):
+    """
+    Approximate the great circle distance (m) between two sets of points.
+
+    Based on https://andrew.hedges.name/experiments/haversine/
+
+    Parameters
+    ----------
+    lon1, lat1, lon2, lat2 : array_like
+        Longitude and latitude of the points, in degrees.
+    """
+    lat1 = np.deg2rad(lat1)
+    lon1 = np.deg2rad(lon1)
+    lat2 = np.deg2rad(lat2)
+    lon2 = np.deg2rad(lon2)
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c * 1000  # converted to meters
+
+
+def _grid_spacing(lat, lon):
+    """
+    Approximate the largest grid spacing (m) near the middle of a grid.
+
+    Parameters
+    ----------
+    lat, lon : xarray.DataArray
+        Grid latitude and longitude (2-D, or 1-D for rectilinear grids).
+    """
+    lat = np.asarray(lat)
+    lon = np.asarray(lon)
+    if lat.ndim == 1:
+        i, j = len(lat) // 2, len(lon) // 2
+        return max(
+            _haversine(lon[j], lat[i], lon[j], lat[i + 1]),
+            _haversine(lon[j], lat[i], lon[j + 1], lat[i]),
+        )
+    i, j = lat.shape[0] // 2, lat.shape[1] // 2
+    return max(
+        _haversine(lon[i, j], lat[i, j], lon[i + 1, j], lat[i + 1, j]),
+        _haversine(lon[i, j], lat[i, j], lon[i, j + 1], lat[i, j + 1]),
+    )
+
+
+def _spatial_tree(lat, lon):
+    """
+    Build a KD-tree of the grid points on the unit sphere.
+
+    The tree for a large grid is cached (keyed on the grid fingerprint),
+    so matching new points on the same grid doesn't rebuild it.
+
+    Parameters
+    ----------
+    lat, lon : array_like
+        Grid latitude and longitude in degrees (any shape).
+    """
+
+    if np.size(lat) < 10_000:
+        return cKDTree(_lonlat_to_xyz(np.ravel(lon), np.ravel(lat)))
+
+    fingerprint = _grid_fingerprint(lat, lon)
+
+    def _tree():
+        # The unit-sphere coordinates may be memory-mapped from the grid
+        # registry (see ``open_grid``)
+        xyz = _CACHE.get(("xyz", fingerprint))
+        if xyz is None:
+            xyz = _lonlat_to_xyz(np.ravel(lon), np.ravel(lat))
+        return cKDTree(xyz)
+
+    return _cached(("tree", fingerprint), _tree)
+
+
+def _fingerprint(*arrays):
+    """Return a short hash of the shape and values of one or more arrays."""
+    h = hashlib.sha1()
+    for a in arrays:
+        a = np.ascontiguousarray(a, dtype=float)
+        h.update(str(a.shape).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()[:16]
+
+
+def _grid_fingerprint(lat, lon):
+    """
+    Return a short hash identifying a grid from its coordinate values.
+
+    Two grids with the same shape and the same latitude and longitude
+    values have the same fingerprint.
+
+    Parameters
+    ----------
+    lat, lon : array_like
+        Grid latitude and longitude.
+    """
+    return _fingerprint(lat, lon)
+
+
+# A small cache of quantities derived from a grid (e.g., normalized
+# longitude), keyed on a grid fingerprint. The most recently used
+# entries are kept.
+_CACHE = {}
+_CACHE_SIZE = 16
+
+
+def _cached(key, func):
+    """Return the cached value for ``key``, computing it with ``func()`` if needed."""
+    if key in _CACHE:
+        _CACHE[key] = _CACHE.pop(key)
+    else:
+        _CACHE[key] = func()
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.pop(next(iter(_CACHE)))
+    return _CACHE[key]
+
+
+def _read_only(array):
+    """Return a read-only view of an array."""
+    array = np.asarray(array).view()
+    array.flags.writeable = False
+    return array
+
+
+def _longitude_convention(lon):
+    """
+    Detect the longitude convention of an array.
+
+    Returns
+    -------
+    360 if any longitude is greater than 180 (i.e., [0, 360] degrees),
+    otherwise 180 (i.e., [-180, 180] degrees).
+    """
+    return 360 if np.nanmax(lon) > 180 else 180
+
+
+def _normalized_longitude(lon, convention=180):
+    """
+    Return longitude in the [-180, 180] or [0, 360] convention.
+
+    This is the only place grid longitudes are wrapped. The input array
+    is never modified. If it already uses the requested convention, a
+    read-only view is returned without copying. Otherwise, the wrapped
+    grid is computed once and cached (keyed on the grid fingerprint), so
+    repeated calls for the same grid don't redo the full-field work.
+
+    Parameters
+    ----------
+    lon : array_like
+        Longitude values.
+    convention : {180, 360}
+        Return longitude in [-180, 180] (180, default) or [0, 360] (360).
+
+    Returns
+    -------
+    numpy.ndarray
+        A read-only array of longitude values.
+    """
+    lon = np.asarray(lon)
+    if convention == 180:
+        in_range = np.nanmin(lon) >= -180 and np.nanmax(lon) <= 180
+    else:
+        in_range = np.nanmin(lon) >= 0 and np.nanmax(lon) <= 360
+    if in_range:
+        return _read_only(lon)
+
+    def _wrap():
+        return _read_only(_to_180(lon) if convention == 180 else np.mod(lon, 360))
+
+    if lon.size < 10_000:
+        # Not worth caching small arrays (e.g., a list of points)
+        return _wrap()
+    return _cached(("longitude", _fingerprint(lon), convention), _wrap)
+
+
+def _outline_longitude(lon):
+    """
+    Return outline longitudes in the convention that keeps them continuous.
+
+    [-180, 180] is preferred. If the outline jumps across the
+    antimeridian in that convention (e.g., a domain over the Pacific),
+    [0, 360] is used instead.
+    """
+    lon = _normalized_longitude(lon, 180)
+    if lon.size > 1 and np.nanmax(np.abs(np.diff(lon))) > 180:
+        lon360 = _normalized_longitude(lon, 360)
+        if np.nanmax(np.abs(np.diff(lon360))) <= 180:
+            return lon360
+    return lon
+
+
+def _normalize_points(points, names=None):
+    """
+    Return arrays of longitude and latitude for a point or list of points.
+
+    Parameters
+    ----------
+    points : tuple, list of tuples, or numpy.ndarray
+        The (lon, lat) pair or pairs. An array with shape (n, 2) may be
+        given for many points.
+    names : list
+        Names for each point. Checked to be the same length as points.
+    """
+    if isinstance(points, np.ndarray) and points.ndim == 2:
+        assert points.shape[1] == 2, "``points`` array should have shape (n, 2)"
+        if names is not None:
+            assert len(points) == len(
+                names
+            ), "`points` and `names` must be same length."
+        return points[:, 0].astype(float), points[:, 1].astype(float)
+
+    if isinstance(points, tuple):
+        # If a tuple is give, turn into a one-item list.
+        points = [points]
+
+    if names is not None:
+        assert len(points) == len(names), "`points` and `names` must be same length."
+
+    for point in points:
+        assert (
+            len(point) == 2
+        ), "``points`` should be a tuple or list of tuples (lon, lat)"
+
+    p_lons = np.array([i[0] for i in points], dtype=float)
+    p_lats = np.array([i[1] for i in points], dtype=float)
+    return p_lons, p_lats
+
+
+def _gnomonic(lon, lat, p_lon, p_lat):
+    """
+    Project lon/lat onto a plane tangent to the sphere at (p_lon, p_lat).
+
+    Great circles are straight lines in the gnomonic projection, so grid
+    cells are well-behaved quadrilaterals around the tangent point.
+
+    Parameters
+    ----------
+    lon, lat : array_like
+        Points to project, in degrees. Shape ``(n, ...)``.
+    p_lon, p_lat : array_like
+        Tangent point for each row, in degrees. Shape ``(n,)``.
+
+    Returns
+    -------
+    x, y : numpy.ndarray
+        Coordinates in the tangent plane (units of earth radius).
+    """
+    xyz = _lonlat_to_xyz(lon, lat)
+    shape = (-1,) + (1,) * (xyz.ndim - 2)
+    p = _lonlat_to_xyz(p_lon, p_lat).reshape(shape + (3,))
+
+    p_lon = np.deg2rad(p_lon).reshape(shape)
+    p_lat = np.deg2rad(p_lat).reshape(shape)
+    east = np.stack(
+        np.broadcast_arrays(-np.sin(p_lon), np.cos(p_lon), 0 * p_lon), axis=-1
+    )
+    north = np.stack(
+        [
+            -np.sin(p_lat) * np.cos(p_lon),
+            -np.sin(p_lat) * np.sin(p_lon),
+            np.cos(p_lat) + 0 * p_lon,
+        ],
+        axis=-1,
+    )
+
+    d = np.sum(xyz * p, axis=-1)
+    return np.sum(xyz * east, axis=-1) / d, np.sum(xyz * north, axis=-1) / d
+
+
+def _bilinear_weights(lat, lon, p_lons, p_lats, nearest):
+    """
+    Stencil and weights for bilinear interpolation on a 2-D curvilinear grid.
+
+    For each point, the four grid cells that share the nearest grid
+    point as a corner are tested. The cell coordinates (s, t) of the
+    point are found by inverting the bilinear map of each cell (a few
+    Newton iterations, vectorized over all points) in the tangent plane
+    at the point. The first cell with 0 <= s, t <= 1 is used.
+
+    Points that are not inside any cell (i.e., outside the grid) fall
+    back to the value of the nearest grid point.
+
+    Parameters
+    ----------
+    lat, lon : numpy.ndarray
+        2-D grid latitude and longitude.
+    p_lons, p_lats : numpy.ndarray
+        Points to interpolate to.
+    nearest : numpy.ndarray
+        Flat index of the grid point nearest each point.
+
+    Returns
+    -------
+    stencil : numpy.ndarray
+        Flat grid index of the 4 cell corners, shape ``(n, 4)``.
+    weights : numpy.ndarray
+        Weight of each cell corner, shape ``(n, 4)``.
+    """
+    ny, nx = lat.shape
+    n = len(p_lons)
+    j0, i0 = np.unravel_index(nearest, lat.shape)
+
+    stencil = np.repeat(nearest[:, None], 4, axis=1)
+    weights = np.tile([1.0, 0.0, 0.0, 0.0], (n, 1))
+    found = np.zeros(n, dtype=bool)
+
+    for dj, di in [(0, 0), (-1, 0), (0, -1), (-1, -1)]:
+        # Lower-left corner of the candidate cell
+        j = np.clip(j0 + dj, 0, ny - 2)
+        i = np.clip(i0 + di, 0, nx - 2)
+        corners = np.stack(
+            [
+                np.ravel_multi_index((j, i), lat.shape),
+                np.ravel_multi_index((j, i + 1), lat.shape),
+                np.ravel_multi_index((j + 1, i), lat.shape),
+                np.ravel_multi_index((j + 1, i + 1), lat.shape),
+            ],
+            axis=1,
+        )
+        x, y = _gnomonic(lon.ravel()[corners], lat.ravel()[corners], p_lons, p_lats)
+
+        # Newton iterations to solve P(s, t) = 0, where P is the bilinear
+        # map of the cell corners and the point is at the origin.
+        s = np.full(n, 0.5)
+        t = np.full(n, 0.5)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for _ in range(8):
+                w = np.stack([(1 - s) * (1 - t), s * (1 - t), (1 - s) * t, s * t], 1)
+                fx = np.sum(w * x, axis=1)
+                fy = np.sum(w * y, axis=1)
+                dxds = (x[:, 1] - x[:, 0]) * (1 - t) + (x[:, 3] - x[:, 2]) * t
+                dyds = (y[:, 1] - y[:, 0]) * (1 - t) + (y[:, 3] - y[:, 2]) * t
+                dxdt = (x[:, 2] - x[:, 0]) * (1 - s) + (x[:, 3] - x[:, 1]) * s
+                dydt = (y[:, 2] - y[:, 0]) * (1 - s) + (y[:, 3] - y[:, 1]) * s
+                det = dxds * dydt - dxdt * dyds
+                s = s - (fx * dydt - fy * dxdt) / det
+                t = t - (fy * dxds - fx * dyds) / det
+
+        eps = 1e-6
+        inside = ~found & (s >= -eps) & (s <= 1 + eps) & (t >= -eps) & (t <= 1 + eps)
+        s = np.clip(s, 0, 1)
+        t = np.clip(t, 0, 1)
+        w = np.stack([(1 - s) * (1 - t), s * (1 - t), (1 - s) * t, s * t], axis=1)
+        stencil[inside] = corners[inside]
+        weights[inside] = w[inside]
+        found |= inside
+
+    return stencil, weights
+
+
+def _idw_weights(tree, p_lons, p_lats, k=4, power=2):
+    """
+    Stencil and weights for inverse-distance weighting from a KD-tree.
+
+    Parameters
+    ----------
+    tree : scipy.spatial.cKDTree
+        Tree of the grid points on the unit sphere (see ``_spatial_tree``).
+    p_lons, p_lats : numpy.ndarray
+        Points to interpolate to.
+    k : int
+        Number of nearest grid points to use.
+    power : float
+        Weights are proportional to 1/distance**power.
+
+    Returns
+    -------
+    stencil : numpy.ndarray
+        Flat grid index of the k nearest grid points, shape ``(n, k)``.
+    weights : numpy.ndarray
+        Weight of each grid point, shape ``(n, k)``.
+    """
+    chord, stencil = tree.query(_lonlat_to_xyz(p_lons, p_lats), k=k)
+    stencil = stencil.reshape(len(p_lons), k)
+    chord = chord.reshape(len(p_lons), k)
+
+    # Great circle distance on the unit sphere from the chord length.
+    distance = 2 * np.arcsin(np.minimum(chord / 2, 1))
+
+    with np.errstate(divide="ignore"):
+        weights = 1 / distance**power
+
+    # A point that lands exactly on a grid point takes that value.
+    exact = distance[:, 0] == 0
+    weights[exact] = 0
+    weights[exact, 0] = 1
+
+    weights /= weights.sum(axis=1, keepdims=True)
+    return stencil, weights
+
+
+def _grid_coords(latitude, longitude):
+    """Return latitude and longitude as DataArrays with named dimensions."""
+    if not isinstance(latitude, xr.DataArray):
+        latitude = np.asarray(latitude)
+        dims = ("latitude",) if latitude.ndim == 1 else ("y", "x")
+        latitude = xr.DataArray(latitude, dims=dims)
+    if not isinstance(longitude, xr.DataArray):
+        longitude = np.asarray(longitude)
+        dims = ("longitude",) if longitude.ndim == 1 else latitude.dims
+        longitude = xr.DataArray(longitude, dims=dims)
+    return latitude, longitude
+
+
+def _grid_dims(latitude, longitude):
+    """
+    Return the grid dimension names and shape for the grid coordinates.
+
+    Parameters
+    ----------
+    latitude, longitude : xarray.DataArray
+        Either 2-D latitude and longitude on the same dimensions
+        (curvilinear grid), or 1-D latitude and longitude on different
+        dimensions (rectilinear grid).
+    """
+    if latitude.ndim == 2 and longitude.dims == latitude.dims:
+        return latitude.dims, latitude.shape
+    elif latitude.ndim == 1 and longitude.ndim == 1 and latitude.dims != longitude.dims:
+        return (
+            latitude.dims + longitude.dims,
+            latitude.shape + longitude.shape,
+        )
+    else:
+        raise ValueError(
+            f"Sorry, I do not understand dimensions {latitude.dims}. "
+            "Expected 2-D ('y', 'x') or 1-D latitude and longitude."
+        )
+
+
+def _axis_position(coord, values, periodic=None):
+    """
+    Locate values between neighboring elements of a 1-D monotonic coordinate.
+
+    Uses a binary search, O(log n) for each value. Works for ascending or
+    descending coordinates.
+
+    Parameters
+    ----------
+    coord : numpy.ndarray
+        1-D monotonic coordinate values.
+    values : numpy.ndarray
+        Values to locate.
+    periodic : None or float
+        If a period is given (e.g., 360 for longitude), the coordinate is
+        treated as cyclic. Values are wrapped into the coordinate's range,
+        and if the coordinate covers the whole circle, values between the
+        last and first element are located in the gap between them.
+
+    Returns
+    -------
+    i0, i1 : numpy.ndarray
+        Index of the elements on either side of each value.
+    frac : numpy.ndarray
+        Fractional position of each value between ``coord[i0]`` (0) and
+        ``coord[i1]`` (1). Values outside the coordinate are clipped to
+        the nearest end.
+    """
+    n = len(coord)
+    if periodic:
+        # Order the coordinate so it starts after its largest gap, then
+        # unwrap so it is monotonic increasing.
+        c = np.mod(coord, periodic)
+        order = np.argsort(c, kind="stable")
+        gaps = np.diff(np.append(c[order], c[order[0]] + periodic))
+        order = np.roll(order, -((np.argmax(gaps) + 1) % n))
+        cs = np.mod(c[order] - c[order[0]], periodic) + c[order[0]]
+        cyclic = gaps.max() <= 1.5 * np.median(gaps)
+        values = np.mod(values - cs[0], periodic) + cs[0]
+        if not cyclic:
+            # Values beyond the last element may be closer to the first.
+            before = (values > cs[-1]) & (
+                (cs[0] + periodic - values) < (values - cs[-1])
+            )
+            values = np.where(before, values - periodic, values)
+    else:
+        order = np.argsort(coord, kind="stable")
+        cs = coord[order]
+        cyclic = False
+
+    if cyclic:
+        k0 = np.searchsorted(cs, values, side="right") - 1
+        k1 = (k0 + 1) % n
+        spacing = np.mod(cs[k1] - cs[k0], periodic)
+        frac = (values - cs[k0]) / spacing
+    else:
+        k0 = np.clip(np.searchsorted(cs, values, side="right") - 1, 0, n - 2)
+        k1 = k0 + 1
+        frac = np.clip((values - cs[k0]) / (cs[k1] - cs[k0]), 0, 1)
+
+    return order[k0], order[k1], frac
+
+
+def _cell_stencil(pos_i, pos_j, shape, grid_lonlat, p_lons, p_lats, method, power=2):
+    """
+    Nearest grid point and interpolation stencil from cell positions.
+
+    Parameters
+    ----------
+    pos_i, pos_j : tuple
+        ``(k0, k1, frac)`` position of each point along the first and
+        second grid dimension (see ``_axis_position``).
+    shape : tuple
+        Grid shape.
+    grid_lonlat : callable
+        ``grid_lonlat(i, j)`` returns the longitude and latitude of grid
+        points (i, j). Only used for method='idw'.
+    p_lons, p_lats : numpy.ndarray
+        The points.
+    method : {'nearest', 'bilinear', 'idw'}
+        See ``PointIndex``. Both interpolation methods use the four
+        corners of the grid cell containing the point.
+    power : float
+        Inverse-distance weighting power.
+
+    Returns
+    -------
+    flat_index, stencil, weights
+        Flat index of the nearest grid point, and the stencil and weights
+        for the interpolation methods (None for nearest).
+    """
+    i0, i1, t = pos_i
+    j0, j1, s = pos_j
+
+    ii = np.where(t < 0.5, i0, i1)
+    jj = np.where(s < 0.5, j0, j1)
+    flat_index = np.ravel_multi_index((ii, jj), shape)
+
+    if method == "nearest":
+        return flat_index, None, None
+
+    stencil = np.stack(
+        [
+            np.ravel_multi_index((i0, j0), shape),
+            np.ravel_multi_index((i0, j1), shape),
+            np.ravel_multi_index((i1, j0), shape),
+            np.ravel_multi_index((i1, j1), shape),
+        ],
+        axis=1,
+    )
+
+    if method == "bilinear":
+        weights = np.stack([(1 - t) * (1 - s), (1 - t) * s, t * (1 - s), t * s], axis=1)
+    elif method == "idw":
+        g_lon, g_lat = grid_lonlat(
+            np.stack([i0, i0, i1, i1], axis=1), np.stack([j0, j1, j0, j1], axis=1)
+        )
+        distance = _haversine(p_lons[:, None], p_lats[:, None], g_lon, g_lat)
+        with np.errstate(divide="ignore"):
+            weights = 1 / distance**power
+        # A point that lands exactly on a grid point takes that value.
+        exact = (distance == 0).any(axis=1)
+        weights[exact] = distance[exact] == 0
+        weights /= weights.sum(axis=1, keepdims=True)
+
+    return flat_index, stencil, weights
+
+
+def _rectilinear_index(lat, lon, p_lons, p_lats, method="nearest", power=2):
+    """
+    Nearest grid point and interpolation stencil on a rectilinear grid.
+
+    Each axis is searched separately with a binary search; there is no
+    need to broadcast the 1-D coordinates to a 2-D grid. Latitude may be
+    ascending or descending, and longitude may use any convention (e.g.,
+    [0, 360] or [-180, 180]).
+
+    Parameters
+    ----------
+    lat, lon : numpy.ndarray
+        1-D grid latitude and longitude.
+    p_lons, p_lats : numpy.ndarray
+        Points to match.
+    method : {'nearest', 'bilinear', 'idw'}
+        See ``PointIndex``. Both interpolation methods use the four
+        corners of the grid cell containing the point.
+    power : float
+        Inverse-distance weighting power.
+
+    Returns
+    -------
+    flat_index, stencil, weights
+        Flat index of the nearest grid point, and the stencil and weights
+        for the interpolation methods (None for nearest).
+    """
+    i0, i1, t = _axis_position(lat, p_lats)
+    j0, j1, s = _axis_position(lon, p_lons, periodic=360)
+
+    return _cell_stencil(
+        (i0, i1, t),
+        (j0, j1, s),
+        (len(lat), len(lon)),
+        lambda i, j: (lon[j], lat[i]),
+        p_lons,
+        p_lats,
+        method,
+        power,
+    )
+
+
+def _crs_position(lat, lon, p_lons, p_lats, crs):
+    """
+    Fractional grid index of points on a regular grid in a map projection.
+
+    Only three grid corners and the points are transformed. The grid
+    origin and spacing come from the corners, so there is no search over
+    the grid.
+
+    Parameters
+    ----------
+    lat, lon : numpy.ndarray
+        2-D grid latitude and longitude.
+    p_lons, p_lats : numpy.ndarray
+        The points.
+    crs : cartopy.crs.CRS
+        The projection the grid is regular in.
+
+    Returns
+    -------
+    fi, fj : numpy.ndarray
+        Fractional index of each point along the first and second grid
+        dimension.
+    """
+    import cartopy.crs as ccrs
+
+    pc = ccrs.PlateCarree()
+    n0, n1 = lat.shape
+    corners = crs.transform_points(
+        pc,
+        np.array([lon[0, 0], lon[-1, 0], lon[0, -1]], dtype=float),
+        np.array([lat[0, 0], lat[-1, 0], lat[0, -1]], dtype=float),
+    )[:, :2]
+    origin = corners[0]
+    step_i = (corners[1] - origin) / (n0 - 1)
+    step_j = (corners[2] - origin) / (n1 - 1)
+
+    pxy = crs.transform_points(pc, p_lons, p_lats)[:, :2]
+    fi, fj = np.linalg.solve(np.column_stack([step_i, step_j]), (pxy - origin).T)
+    return fi, fj
+
+
+def _fractional_position(f, n):
+    """Cell position ``(k0, k1, frac)`` of fractional indices along an axis of length n."""
+    k0 = np.clip(np.floor(f).astype(int), 0, n - 2)
+    frac = np.clip(f - k0, 0, 1)
+    return k0, k0 + 1, frac
+
+
+def _projected_index(lat, lon, p_lons, p_lats, method="nearest", *, crs, power=2):
+    """
+    Nearest grid point and interpolation stencil on a projected grid.
+
+    The points are transformed to the grid's projection coordinates and
+    the indexes are computed from the grid origin and spacing. Matching
+    is O(points), no matter how large the grid is.
+
+    Parameters
+    ----------
+    lat, lon : numpy.ndarray
+        2-D grid latitude and longitude.
+    p_lons, p_lats : numpy.ndarray
+        Points to match.
+    method : {'nearest', 'bilinear', 'idw'}
+        See ``PointIndex``.
+    crs : cartopy.crs.CRS
+        The projection the grid is regular in.
+    power : float
+        Inverse-distance weighting power.
+    """
+    fi, fj = _crs_position(lat, lon, p_lons, p_lats, crs)
+    return _cell_stencil(
+        _fractional_position(fi, lat.shape[0]),
+        _fractional_position(fj, lat.shape[1]),
+        lat.shape,
+        lambda i, j: (lon[i, j], lat[i, j]),
+        p_lons,
+        p_lats,
+        method,
+        power,
+    )
+
+
+def _dataset_crs(ds):
+    """Return the projection described by the GRIB attributes of a Dataset or DataArray."""
+    from toolbox.cartopy_tools import _crs_from_grib_attrs
+
+    variables = [ds] if isinstance(ds, xr.DataArray) else ds.data_vars.values()
+    for da in variables:
+        if "GRIB_gridType" in da.attrs:
+            return _crs_from_grib_attrs(da.attrs)
+    raise ValueError(
+        "👻 Could not find GRIB attributes to determine the projection. "
+        "Please give a cartopy.crs object instead."
+    )
+
+
+def grid_index_from_crs(ds, points, crs="grib"):
+    """
+    Fractional grid index of points on a grid that is regular in a projection.
+
+    Model grids like HRRR and NAM are regular in Lambert conformal
+    coordinates. Instead of searching the 2-D latitude and longitude
+    arrays, the points are transformed to the projection coordinates and
+    the index is computed from the grid origin and spacing.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        The Dataset should include 2-D coordinates for both 'latitude'
+        and 'longitude'.
+    points : tuple or list of tuples
+        The longitude and latitude (lon, lat) coordinate pair (as a tuple)
+        for the points.
+    crs : 'grib' or cartopy.crs.CRS
+        The projection of the grid. If 'grib' (default), the projection
+        is built from the GRIB attributes of the Dataset variables (i.e.,
+        the Dataset was opened with cfgrib).
+
+    Returns
+    -------
+    dict
+        The fractional index along each grid dimension, e.g.,
+        ``{'y': array([...]), 'x': array([...])}``. Round the values to get
+        the nearest grid point. Values may be outside the grid.
+    """
+    if "lat" in ds:
+        ds = ds.rename(dict(lat="latitude", lon="longitude"))
+    if isinstance(crs, str) and crs == "grib":
+        crs = _dataset_crs(ds)
+    p_lons, p_lats = _normalize_points(points)
+    fi, fj = _crs_position(
+        np.asarray(ds.latitude), np.asarray(ds.longitude), p_lons, p_lats, crs
+    )
+    return dict(zip(ds.latitude.dims, (fi, fj)))
+
+
+def _radius_weights(tree, p_lons, p_lats, radius_km):
+    """
+    Stencil of all grid points within a radius of each point.
+
+    The neighbor sets are padded to the size of the largest one. Padding
+    has a weight of 0; the real neighbors have equal weights that sum to
+    1 (so the weighted sum is the neighborhood mean). Points with no grid
+    points within the radius have NaN weights.
+
+    Parameters
+    ----------
+    tree : scipy.spatial.cKDTree
+        Tree of the grid points on the unit sphere (see ``_spatial_tree``).
+    p_lons, p_lats : numpy.ndarray
+        The points.
+    radius_km : float
+        Neighborhood radius in kilometers (great circle distance).
+
+    Returns
+    -------
+    stencil : numpy.ndarray
+        Flat grid index of the neighbors, shape ``(n, k)``.
+    weights : numpy.ndarray
+        Weight of each neighbor, shape ``(n, k)``.
+    """
+    # Great circle distance to chord length on the unit sphere
+    chord = 2 * np.sin(radius_km / R / 2)
+    neighbors = tree.query_ball_point(_lonlat_to_xyz(p_lons, p_lats), r=chord)
+
+    count = np.array([len(i) for i in neighbors])
+    n, k = len(count), max(1, count.max(initial=0))
+    rows = np.repeat(np.arange(n), count)
+    cols = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+
+    stencil = np.zeros((n, k), dtype=int)
+    weights = np.zeros((n, k))
+    if count.sum():
+        stencil[rows, cols] = np.concatenate(neighbors)
+        weights[rows, cols] = 1 / np.repeat(count, count)
+    weights[count == 0] = np.nan
+    return stencil, weights
+
+
+def _curvilinear_index(lat, lon, p_lons, p_lats, method="nearest", **kwargs):
+    """
+    Nearest grid point and interpolation stencil on a curvilinear grid.
+
+    All the points are matched in a single KD-tree query.
+
+    Parameters
+    ----------
+    lat, lon : numpy.ndarray
+        2-D grid latitude and longitude.
+    p_lons, p_lats : numpy.ndarray
+        Points to match.
+    method : {'nearest', 'bilinear', 'idw', 'radius'}
+        See ``PointIndex``.
+    **kwargs
+        Passed to ``_idw_weights`` or ``_radius_weights``.
+
+    Returns
+    -------
+    flat_index, stencil, weights
+        Flat index of the nearest grid point, and the stencil and weights
+        for the interpolation methods (None for nearest).
+    """
+    tree = _spatial_tree(lat, lon)
+    _, flat_index = tree.query(_lonlat_to_xyz(p_lons, p_lats))
+
+    if method == "nearest":
+        return flat_index, None, None
+    elif method == "bilinear":
+        stencil, weights = _bilinear_weights(lat, lon, p_lons, p_lats, flat_index)
+    elif method == "idw":
+        stencil, weights = _idw_weights(tree, p_lons, p_lats, **kwargs)
+    elif method == "radius":
+        stencil, weights = _radius_weights(tree, p_lons, p_lats, **kwargs)
+
+    return flat_index, stencil, weights
+
+
+class PointIndex:
+    """
+    Grid indices of the points nearest a list of (lon, lat) points.
+
+    Optionally, the index also holds the stencil (grid indices) and
+    weights to interpolate the grid to the points. The weights are
+    computed once and applied to every variable and time step as a
+    weighted sum over the stencil.
+
+    Matching a station list to a model grid only needs to be done once
+    per grid. Build a PointIndex once, save it to disk, and reuse it with
+    ``pluck_points(ds, index=idx)`` for every forecast hour and model run
+    of that grid.
+
+    The index is keyed on a fingerprint of the grid's latitude and
+    longitude arrays, so it will refuse to be used on a different grid.
+
+    .. code-block:: python
+
+        idx = PointIndex.from_dataset(ds, points, names=names)
+        idx.save("hrrr_stations.npz")
+
+        idx = PointIndex.load("hrrr_stations.npz")
+        ds_points = pluck_points(ds, index=idx)
+    """
+
+    def __init__(
+        self,
+        latitude,
+        longitude,
+        points,
+        names=None,
+        *,
+        method="nearest",
+        crs=None,
+        **kwargs,
+    ):
+        """
+        Match points to the nearest grid points.
+
+        Parameters
+        ----------
+        latitude, longitude : xarray.DataArray or numpy.ndarray
+            The grid latitude and longitude in degrees. Either 2-D
+            arrays (curvilinear grid) or 1-D arrays along different
+            dimensions (rectilinear grid). If numpy arrays are given,
+            the dimensions are assumed to be ('y', 'x') for 2-D arrays
+            and ('latitude',), ('longitude',) for 1-D arrays.
+        points : tuple or list of tuples
+            The longitude and latitude (lon, lat) coordinate pair (as a
+            tuple) for the points you want to match to the grid.
+        names : list
+            A list of names for each point location (i.e., station name).
+        method : {'nearest', 'bilinear', 'idw'}
+            How the grid values are mapped to the points.
+            - nearest: value of the nearest grid point (default)
+            - bilinear: bilinear interpolation within the grid cell
+              containing the point.
+            - idw: inverse-distance weighting of the nearest grid points.
+            - radius: all grid points within ``radius_km`` of the point,
+              equally weighted (the neighborhood mean). See
+              ``pluck_neighborhood`` for other statistics.
+        crs : cartopy.crs.CRS
+            If the 2-D grid is regular in a map projection (e.g., Lambert
+            conformal for HRRR), give the projection to compute the index
+            directly from the grid origin and spacing instead of
+            searching the grid. See ``grid_index_from_crs``.
+        **kwargs
+            For method='idw', ``k`` (number of grid points, default 4)
+            and ``power`` (default 2). For rectilinear grids and when
+            ``crs`` is given, the four corners of the grid cell are
+            always used. For method='radius', ``radius_km``.
+        """
+        _method = {"nearest", "bilinear", "idw", "radius"}
+        assert method in _method, f"method must be one of {_method}."
+
+        latitude, longitude = _grid_coords(latitude, longitude)
+        self.dims, self.shape = _grid_dims(latitude, longitude)
+
+        self.points_lon, self.points_lat = _normalize_points(points, names)
+        self.names = None if names is None else np.asarray(names)
+
+        lat = np.asarray(latitude)
+        lon = np.asarray(longitude)
+        self.fingerprint = _grid_fingerprint(lat, lon)
+
+        grid_lat, grid_lon = lat, lon
+        if method == "radius":
+            # Neighborhood: KD-tree search of all grid points.
+            match = _curvilinear_index
+            if lat.ndim == 1:
+                grid_lon, grid_lat = np.meshgrid(lon, lat)
+        elif lat.ndim == 1:
+            # Rectilinear grid: sorted search along each axis.
+            match = _rectilinear_index
+        elif crs is not None:
+            # Projected grid: index from the grid origin and spacing.
+            match = partial(_projected_index, crs=crs)
+        else:
+            # Curvilinear grid: KD-tree search of all grid points.
+            match = _curvilinear_index
+
+        self.method = method
+        self.radius_km = kwargs.get("radius_km") if method == "radius" else None
+        flat_index, self.stencil, self.weights = match(
+            grid_lat, grid_lon, self.points_lon, self.points_lat, method, **kwargs
+        )
+        ii, jj = np.unravel_index(flat_index, self.shape)
+        self.indices = dict(zip(self.dims, (ii, jj)))
+
+        if lat.ndim == 1:
+            self.grid_lat = lat[ii]
+            self.grid_lon = lon[jj]
+        else:
+            self.grid_lat = lat.ravel()[flat_index]
+            self.grid_lon = lon.ravel()[flat_index]
+
+        # Matched grid longitude is reported in degrees [-180, 180]
+        self.grid_lon = np.array(_normalized_longitude(self.grid_lon))
+
+        # 📐Approximate the Great Circle distance between matched point and
+        # requested point.
+        self.distance = _haversine(
+            self.points_lon, self.points_lat, self.grid_lon, self.grid_lat
+        )
+
+    @classmethod
+    def from_dataset(cls, ds, points, names=None, *, crs=None, **kwargs):
+        """
+        Match points to the nearest grid points of a Dataset.
+
+        Parameters
+        ----------
+        ds : xarray.Dataset
+            The Dataset should include coordinates for both 'latitude' and
+            'longitude' (or 'lat' and 'lon').
+        points, names, method, kwargs :
+            See ``PointIndex``.
+        crs : None, 'grib', or cartopy.crs.CRS
+            See ``PointIndex``. If 'grib', the projection is built from
+            the GRIB attributes of the Dataset variables.
+        """
+        if "lat" in ds:
+            ds = ds.rename(dict(lat="latitude", lon="longitude"))
+        if isinstance(crs, str) and crs == "grib":
+            crs = _dataset_crs(ds)
+        return cls(ds.latitude, ds.longitude, points, names=names, crs=crs, **kwargs)
+
+    def __len__(self):
+        return len(self.points_lon)
+
+    def __repr__(self):
+        return (
+            f"PointIndex({len(self):,} points on {self.dims}={self.shape} "
+            f"grid, method='{self.method}', fingerprint='{self.fingerprint}')"
+        )
+
+    def check(self, ds):
+        """
+        Raise a ValueError if the index was not built for this Dataset's grid.
+
+        Parameters
+        ----------
+        ds : xarray.Dataset
+            Dataset with 'latitude' and 'longitude' coordinates.
+        """
+        if "lat" in ds:
+            ds = ds.rename(dict(lat="latitude", lon="longitude"))
+        dims, shape = _grid_dims(ds.latitude, ds.longitude)
+        if dims != self.dims or shape != self.shape:
+            raise ValueError(
+                f"👻 PointIndex was built for a {self.dims}={self.shape} grid, "
+                f"not {dims}={shape}."
+            )
+        fingerprint = _grid_fingerprint(ds.latitude, ds.longitude)
+        if fingerprint != self.fingerprint:
+            raise ValueError(
+                f"👻 PointIndex was built for grid '{self.fingerprint}', "
+                f"but the Dataset is grid '{fingerprint}'."
+            )
+
+    def select(self, ds):
+        """
+        Select (or interpolate) the Dataset values at the points.
+
+        The result has a new 'point' dimension that replaces the grid
+        dimensions. All other dimensions (time, level, etc.) are kept,
+        and dask-backed Datasets stay lazy.
+
+        Parameters
+        ----------
+        ds : xarray.Dataset or xarray.DataArray
+            Data on the grid this index was built for.
+        """
+        if self.stencil is None:
+            # Pointwise (vectorized) indexing. Indexing with DataArrays that
+            # share the 'point' dimension selects the (y, x) pairs in one
+            # operation. The matched coordinates come from the index, so
+            # lazy coordinates aren't computed and longitude is always in
+            # degrees [-180, 180].
+            ds = ds.isel(
+                {dim: xr.DataArray(i, dims="point") for dim, i in self.indices.items()}
+            )
+            return ds.assign_coords(
+                latitude=("point", self.grid_lat),
+                longitude=("point", self.grid_lon),
+            )
+
+        # Gather the stencil for every point in one indexing operation,
+        # then take the weighted sum over the stencil. This is a sparse
+        # (points x grid cells) matrix product, applied to every variable
+        # and time step at once.
+        stencil = np.unravel_index(self.stencil, self.shape)
+        ds = ds.isel(
+            {
+                dim: xr.DataArray(i, dims=("point", "stencil"))
+                for dim, i in zip(self.dims, stencil)
+            }
+        )
+        weights = xr.DataArray(self.weights, dims=("point", "stencil"))
+
+        def _weighted_sum(da):
+            if "stencil" not in da.dims:
+                return da
+            return (da * weights).sum("stencil", skipna=False)
+
+        ds = ds.drop_vars([i for i in ds.coords if "stencil" in ds[i].dims])
+        if isinstance(ds, xr.DataArray):
+            ds = _weighted_sum(ds)
+        else:
+            ds = ds.map(_weighted_sum)
+
+        # Interpolated values are at the requested points
+        return ds.assign_coords(
+            latitude=("point", self.points_lat),
+            longitude=("point", _normalized_longitude(self.points_lon)),
+        )
+
+    def to_dataframe(self):
+        """Return the matched points as a pandas DataFrame."""
+        import pandas as pd
+
+        df = pd.DataFrame(
+            {
+                "name": self.names,
+                "lon": self.points_lon,
+                "lat": self.points_lat,
+                **{f"{dim}_index": i for dim, i in self.indices.items()},
+                "grid_lon": self.grid_lon,
+                "grid_lat": self.grid_lat,
+                "distance": self.distance,
+            }
+        )
+        if self.stencil is not None:
+            for k in range(self.stencil.shape[1]):
+                df[f"stencil_{k}"] = self.stencil[:, k]
+                df[f"weight_{k}"] = self.weights[:, k]
+        df.attrs = dict(
+            fingerprint=self.fingerprint,
+            dims=list(self.dims),
+            shape=list(self.shape),
+            method=self.method,
+            radius_km=self.radius_km,
+        )
+        return df
+
+    def save(self, path):
+        """
+        Save the index to a file.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            File name. If the suffix is '.parquet', the index is saved
+            as a Parquet table (requires pyarrow); otherwise, it is saved
+            as a NumPy '.npz' file.
+        """
+        path = Path(path)
+        if path.suffix == ".parquet":
+            self.to_dataframe().to_parquet(path)
+        else:
+            np.savez(
+                path,
+                fingerprint=self.fingerprint,
+                dims=np.array(self.dims),
+                shape=np.array(self.shape),
+                points_lon=self.points_lon,
+                points_lat=self.points_lat,
+                names=np.array([] if self.names is None else self.names),
+                has_names=self.names is not None,
+                **{f"{dim}_index": i for dim, i in self.indices.items()},
+                grid_lon=self.grid_lon,
+                grid_lat=self.grid_lat,
+                distance=self.distance,
+                method=self.method,
+                radius_km=np.nan if self.radius_km is None else self.radius_km,
+                **(
+                    {}
+                    if self.stencil is None
+                    else dict(stencil=self.stencil, weights=self.weights)
+                ),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved with ``PointIndex.save``.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            A '.npz' or '.parquet' file.
+        """
+        path = Path(path)
+        self = cls.__new__(cls)
+        if path.suffix == ".parquet":
+            import pandas as pd
+
+            df = pd.read_parquet(path)
+            self.fingerprint = df.attrs["fingerprint"]
+            self.dims = tuple(df.attrs["dims"])
+            self.shape = tuple(df.attrs["shape"])
+            self.points_lon = df["lon"].to_numpy()
+            self.points_lat = df["lat"].to_numpy()
+            self.names = None if df["name"].isna().all() else df["name"].to_numpy()
+            self.indices = {dim: df[f"{dim}_index"].to_numpy() for dim in self.dims}
+            self.grid_lon = df["grid_lon"].to_numpy()
+            self.grid_lat = df["grid_lat"].to_numpy()
+            self.distance = df["distance"].to_numpy()
+            self.method = df.attrs["method"]
+            self.radius_km = df.attrs.get("radius_km")
+            if self.method == "nearest":
+                self.stencil = None
+                self.weights = None
+            else:
+                k = sum(c.startswith("stencil_") for c in df.columns)
+                self.stencil = df[[f"stencil_{i}" for i in range(k)]].to_numpy()
+                self.weights = df[[f"weight_{i}" for i in range(k)]].to_numpy()
+        else:
+            with np.load(path) as f:
+                self.fingerprint = str(f["fingerprint"])
+                self.dims = tuple(str(i) for i in f["dims"])
+                self.shape = tuple(int(i) for i in f["shape"])
+                self.points_lon = f["points_lon"]
+                self.points_lat = f["points_lat"]
+                self.names = f["names"] if f["has_names"] else None
+                self.indices = {dim: f[f"{dim}_index"] for dim in self.dims}
+                self.grid_lon = f["grid_lon"]
+                self.grid_lat = f["grid_lat"]
+                self.distance = f["distance"]
+                self.method = str(f["method"])
+                radius_km = float(f["radius_km"])
+                self.radius_km = None if np.isnan(radius_km) else radius_km
+                self.stencil = f["stencil"] if "stencil" in f else None
+                self.weights = f["weights"] if "weights" in f else None
+        return self
+
+
+def pluck_points(
+    ds,
+    points=None,
+    names=None,
+    dist_thresh=10_000,
+    verbose=False,
+    *,
+    method="nearest",
+    crs=None,
+    index=None,
+    output="dataset",
+    **kwargs,
+):
     """
     Pluck values at point nearest a give list of latitudes and longitudes pairs.
 
-    Uses a nearest neighbor approach to get the values. The general
-    methodology is illustrated in this
+    Uses a nearest neighbor approach to get the values. The grid points
+    are placed on a unit sphere and searched with a KD-tree, so all the
+    requested points are matched in a single query and the result is
+    the nearest grid point by great-circle distance (no problems at the
+    dateline). For rectilinear grids with 1-D latitude and longitude
+    coordinates (e.g., GFS, ERA5), the indexes are found with a binary
+    search along each axis instead. The general methodology is illustrated in this
     `GitHub Notebook <https://github.com/blaylockbk/pyBKB_v3/blob/master/demo/Nearest_lat-lon_Grid.ipynb>`_.
 
     Parameters
     ----------
     ds : xarray.Dataset
         The Dataset should include coordinates for both 'latitude' and
-        'longitude'.
+        'longitude', either 2-D or 1-D.
     points : tuple or list of tuples
         The longitude and latitude (lon, lat) coordinate pair (as a tuple)
         for the points you want to pluck from the gridded Dataset.
         A list of tuples may be given to return the values from multiple points.
+        Not needed if ``index`` is given.
     names : list
         A list of names for each point location (i.e., station name).
         None will not append any names. names should be the same
@@ -66,151 +1303,1108 @@ def pluck_points(ds, points, names=None, dist_thresh=10_000, verbose=False):
         The maximum distance (m) between a plucked point and a matched point.
         Default is 10,000 m. If the distance is larger than this, the point
         is disregarded.
+    method : {'nearest', 'bilinear', 'idw', 'radius'}
+        - nearest: value at the grid point nearest the point (default).
+        - bilinear: bilinear interpolation within the grid cell.
+        - idw: inverse-distance weighting of the 4 nearest grid points.
+        - radius: mean of the grid points within ``radius_km``.
+        For the interpolation methods, the latitude and longitude of the
+        result are the requested points, and the distance is still
+        measured to the nearest grid point.
+    crs : None, 'grib', or cartopy.crs.CRS
+        For grids that are regular in a map projection (e.g., HRRR and
+        NAM Lambert conformal grids), compute the index directly from the
+        grid origin and spacing instead of searching the grid. If 'grib',
+        the projection is built from the GRIB attributes of a Dataset
+        opened with cfgrib. See ``grid_index_from_crs``.
+    index : PointIndex
+        A precomputed index of the points for this grid. When given,
+        the nearest neighbor search is skipped; ``points``, ``names``,
+        ``method`` and ``crs`` are taken from the index.
+    output : {'dataset', 'table'}
+        - dataset: an xarray Dataset with a 'point' dimension (default).
+        - table: a tidy pandas DataFrame with one row for each point and
+          each value of the other dimensions (e.g., time), and a column
+          for each coordinate and variable. This is built directly from
+          the plucked arrays and is ready to write to Parquet.
+    **kwargs
+        Passed to ``PointIndex`` (e.g., ``k`` and ``power`` for
+        method='idw', ``radius_km`` for method='radius').
+
+    Returns
+    -------
+    The Dataset values at the points nearest the requested lat/lon points.
+    """
+    _output = {"dataset", "table"}
+    assert output in _output, f"output must be one of {_output}."
+
+    if "lat" in ds:
+        ds = ds.rename(dict(lat="latitude", lon="longitude"))
+
+    if index is None:
+        assert points is not None, "👻 Must give `points` or `index`."
+        index = PointIndex.from_dataset(
+            ds, points, names=names, method=method, crs=crs, **kwargs
+        )
+    else:
+        index.check(ds)
+
+    names = index.names
+    p_lons = index.points_lon
+    p_lats = index.points_lat
+
+    # ===================================================================
+    # Select Method 1:
+    # This method works, but returns more data than you ask for.
+    # It returns an NxN matrix where N is the number of points,
+    # and matches each point with each point (not just the coordinate
+    # pairs). The points you want will be along the diagonal.
+    # I leave this here so I remember not to do this.
+    #
+    # ds = ds.isel(x=xs, y=ys)
+    #
+    # ===================================================================
+
+    # ===================================================================
+    # Select Method 2:
+    # This returns just the data at the points you requested, but builds
+    # a Dataset for every point and then concatenates them, which is
+    # slow for hundreds of points. Don't do this either.
+    #
+    # ds = xr.concat([ds.isel(x=i, y=j) for i, j in zip(xs, ys)], dim="point")
+    #
+    # ===================================================================
+
+    # ===================================================================
+    # Select Method 3:
+    # Pointwise (vectorized) indexing. Indexing with DataArrays that share
+    # the 'point' dimension selects the (y, x) pairs in one operation and
+    # creates a new dimension, called 'point'. All other dimensions (time,
+    # level, etc.) are kept, and dask-backed Datasets stay lazy.
+    # (Interpolation methods gather a stencil for each point the same way
+    # and take the weighted sum.)
+    ds = index.select(ds)
+    ds = ds.transpose("point", ...)
+    # ===================================================================
+
+    # Add the distance values as a coordinate
+    ds.coords["distance"] = ("point", index.distance)
+    ds["distance"].attrs = dict(
+        long_name="Distance between requested point and matched grid point", units="m"
+    )
+
+    # Add list of names as a coordinate
+    if hasattr(names, "__len__"):
+        # Assign the point dimension as the names.
+        assert len(ds.point) == len(
+            names
+        ), f"`names` must be same length as `points` pairs."
+        ds["point"] = names
+
+    ## Print some info about each point:
+    if verbose:
+        p_names = ds.point.data
+        zipped = zip(
+            p_lons, p_lats, index.grid_lon, index.grid_lat, index.distance, p_names
+        )
+        for plon, plat, glon, glat, d, name in zipped:
+            print(
+                f"🔎 Matched requested point [{name}] ({plat:.3f}, {plon:.3f}) to grid point ({glat:.3f}, {glon:.3f}). Distance of {d/1000:,.2f} km."
+            )
+            if d > dist_thresh:
+                print(f"   💀 Point [{name}] Failed distance threshold")
+
+    for dim, i in index.indices.items():
+        ds.attrs[f"{dim}_index"] = i.tolist()
+
+    # Drop points that do not meet the dist_thresh criteria. Indexing
+    # only the points that passed (instead of `where`) doesn't copy the
+    # other points or change integers to floats.
+    failed = index.distance > dist_thresh
+    if failed.any():
+        warnings.warn(f" 💀 Dropped {failed.sum()} point(s) that exceeded dist_thresh.")
+        ds = ds.isel(point=np.flatnonzero(~failed))
+
+    if output == "table":
+        return _points_table(ds)
+
+    return ds
+
+
+def _points_table(ds):
+    """
+    Return a tidy DataFrame of plucked points.
+
+    Each coordinate and variable is broadcast to the full
+    ('point', ...) shape and flattened into a column, without
+    building a MultiIndex.
+    """
+    import pandas as pd
+
+    dims = list(ds.dims)
+    dims.insert(0, dims.pop(dims.index("point")))
+    shape = tuple(ds.sizes[d] for d in dims)
+
+    def _column(var):
+        values = var.transpose(*[d for d in dims if d in var.dims]).values
+        values = values.reshape([ds.sizes[d] if d in var.dims else 1 for d in dims])
+        return np.broadcast_to(values, shape).ravel()
+
+    columns = {}
+    for d in dims:
+        if d in ds.coords:
+            columns[d] = _column(ds[d].variable)
+        else:
+            columns[d] = _column(xr.Variable(d, np.arange(ds.sizes[d])))
+    for name, var in ds.variables.items():
+        if name not in columns:
+            columns[name] = _column(var)
+    return pd.DataFrame(columns)
+
+
+def _chunk_bounds(ds, dim):
+    """Return the start index of each chunk along a dimension (and the end)."""
+    chunks = ds.chunks.get(dim) if ds.chunks else None
+    if not chunks:
+        return np.array([0, ds.sizes[dim]])
+    return np.concatenate([[0], np.cumsum(chunks)])
+
+
+def _gather(block, i, j):
+    """Gather the values at grid points (i, j) from the last two dims of a block."""
+    return np.asarray(block)[..., i, j]
+
+
+def pluck_points_chunked(
+    ds,
+    points=None,
+    names=None,
+    dist_thresh=10_000,
+    *,
+    store=None,
+    time_dim="time",
+    time_chunk=None,
+    method="nearest",
+    crs=None,
+    index=None,
+):
+    """
+    Pluck values at many points from a large, dask-backed Dataset.
+
+    Designed for a Dataset opened from many files (e.g., a month of HRRR
+    with ``xarray.open_mfdataset``). The grid points needed for every
+    station are grouped by the spatial chunk they fall in, so each chunk
+    is read once for each block of time steps, no matter how many
+    stations are in it. The task graph grows with the number of chunks,
+    not the number of stations.
+
+    The Dataset is processed one time block at a time. If a ``store`` is
+    given, each block is appended to a Zarr store as soon as it is done,
+    so a multi-year station time series can be built without holding
+    the grid (or the full result) in memory.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        The Dataset should include coordinates for both 'latitude' and
+        'longitude'. Only variables on the grid (i.e., that have the
+        grid dimensions) are plucked.
+    points, names, dist_thresh, method, crs, index :
+        See ``pluck_points``. Points that exceed ``dist_thresh`` are
+        dropped before any data is read.
+    store : None, str, or pathlib.Path
+        A Zarr store to write to. If None, the result is returned in
+        memory.
+    time_dim : str
+        The dimension to stream along.
+    time_chunk : int
+        Number of time steps in each block. Default is the Dataset's
+        chunk size along ``time_dim`` (or all the time steps).
+
+    Returns
+    -------
+    xarray.Dataset
+        The values with dimensions ``(time, ..., point)``. If ``store`` is
+        given, the Dataset is opened lazily from the store.
+    """
+    if "lat" in ds:
+        ds = ds.rename(dict(lat="latitude", lon="longitude"))
+
+    if index is None:
+        assert points is not None, "👻 Must give `points` or `index`."
+        index = PointIndex.from_dataset(ds, points, names=names, method=method, crs=crs)
+    else:
+        index.check(ds)
+
+    # Drop points that do not meet the dist_thresh criteria before reading
+    keep = index.distance <= dist_thresh
+    if np.sum(~keep) >= 1:
+        warnings.warn(
+            f" 💀 Dropped {np.sum(~keep)} point(s) that exceeded dist_thresh."
+        )
+
+    # Every grid cell needed, as a (point, stencil) array of flat indexes
+    if index.stencil is None:
+        cells = np.ravel_multi_index(
+            [i[keep] for i in index.indices.values()], index.shape
+        )[:, None]
+        weights = None
+    else:
+        cells = index.stencil[keep]
+        weights = index.weights[keep]
+    cells = cells.ravel()
+
+    # Group the cells by the spatial chunk they fall in.
+    dim_i, dim_j = index.dims
+    ci, cj = np.unravel_index(cells, index.shape)
+    bounds_i = _chunk_bounds(ds, dim_i)
+    bounds_j = _chunk_bounds(ds, dim_j)
+    bi = np.searchsorted(bounds_i, ci, side="right") - 1
+    bj = np.searchsorted(bounds_j, cj, side="right") - 1
+    chunk_id, group = np.unique(bi * len(bounds_j) + bj, return_inverse=True)
+    groups = []
+    for g, cid in enumerate(chunk_id):
+        b_i, b_j = divmod(cid, len(bounds_j))
+        members = np.flatnonzero(group == g)
+        groups.append(
+            (
+                slice(bounds_i[b_i], bounds_i[b_i + 1]),
+                slice(bounds_j[b_j], bounds_j[b_j + 1]),
+                members,
+                ci[members] - bounds_i[b_i],
+                cj[members] - bounds_j[b_j],
+            )
+        )
+
+    variables = [var for var in ds.data_vars if {dim_i, dim_j}.issubset(ds[var].dims)]
+
+    if time_dim in ds.dims:
+        if time_chunk is None:
+            time_chunk = (ds.chunks.get(time_dim) or [ds.sizes[time_dim]])[0]
+        starts = range(0, ds.sizes[time_dim], time_chunk)
+        time_blocks = [slice(t, t + time_chunk) for t in starts]
+    else:
+        time_blocks = [None]
+
+    coords = dict(
+        latitude=("point", index.grid_lat[keep]),
+        longitude=("point", index.grid_lon[keep]),
+        distance=("point", index.distance[keep]),
+    )
+    if index.names is not None:
+        coords["point"] = index.names[keep]
+
+    results = []
+    for b, t in enumerate(time_blocks):
+        sub = ds if t is None else ds.isel({time_dim: t})
+        first = b == 0
+
+        # One task per (variable, chunk). Each reads its chunk once and
+        # gathers the values for every station in that chunk.
+        tasks = {}
+        for var in variables:
+            if store is not None and not first and time_dim not in sub[var].dims:
+                # Static fields are only written with the first block
+                continue
+            da = sub[var].transpose(..., dim_i, dim_j)
+            for g, (si, sj, _, li, lj) in enumerate(groups):
+                block = da.data[..., si, sj]
+                if hasattr(block, "dask"):
+                    import dask
+
+                    tasks[var, g] = dask.delayed(_gather)(block, li, lj)
+                else:
+                    tasks[var, g] = _gather(block, li, lj)
+
+        if any(hasattr(v, "dask") for v in tasks.values()):
+            import dask
+
+            keys = list(tasks)
+            tasks = dict(zip(keys, dask.compute(*tasks.values())))
+
+        data_vars = {}
+        for var in variables:
+            if (var, 0) not in tasks:
+                continue
+            da = sub[var].transpose(..., dim_i, dim_j)
+            lead = da.shape[:-2]
+            values = np.empty(lead + (len(cells),), dtype=da.dtype)
+            for g, (_, _, members, _, _) in enumerate(groups):
+                values[..., members] = tasks[var, g]
+            if index.stencil is not None:
+                values = (values.reshape(lead + weights.shape) * weights).sum(-1)
+            data_vars[var] = (da.dims[:-2] + ("point",), values, da.attrs)
+
+        other_coords = {
+            k: v
+            for k, v in sub.coords.items()
+            if dim_i not in v.dims and dim_j not in v.dims
+        }
+        result = xr.Dataset(
+            data_vars, coords={**other_coords, **coords}, attrs=ds.attrs
+        )
+        if store is None:
+            results.append(result)
+        elif first:
+            result.to_zarr(store, mode="w")
+        else:
+            result.to_zarr(store, append_dim=time_dim)
+
+    if store is not None:
+        return xr.open_zarr(store)
+    if len(results) == 1:
+        return results[0]
+    return xr.concat(results, dim=time_dim, data_vars="minimal", coords="minimal")
+
+
+def _pluck_file(path, index, dist_thresh, open_kwargs, dst):
+    """Pluck the points from one file and write them to a Parquet file."""
+    with xr.open_dataset(path, **open_kwargs) as ds:
+        df = pluck_points(ds, index=index, dist_thresh=np.inf, output="table")
+    df = df[df["distance"] <= dist_thresh]
+    df["file"] = str(path)
+
+    # Write to a temporary file first so an interrupted run never leaves
+    # a partial file that would be mistaken for a finished one.
+    tmp = dst.with_suffix(".tmp")
+    df.to_parquet(tmp)
+    tmp.replace(dst)
+    return dst
+
+
+def pluck_timeseries(
+    files,
+    points=None,
+    store="pluck_timeseries",
+    names=None,
+    dist_thresh=10_000,
+    *,
+    method="nearest",
+    crs=None,
+    index=None,
+    max_threads=4,
+    verbose=True,
+    **open_kwargs,
+):
+    """
+    Pluck points from many gridded files into a Parquet dataset on disk.
+
+    The points are matched to the grid once (using the first file), and
+    the files are read with a bounded pool of threads. The points from
+    each file are written to their own Parquet file in the ``store``
+    directory as soon as the file is done, so memory use does not grow
+    with the number of files.
+
+    The pipeline is restartable. Files that already have output in the
+    store are skipped, so if a run is interrupted, just call it again.
+
+    .. code-block:: python
+
+        files = sorted(Path("hrrr").glob("*.grib2"))
+        store = pluck_timeseries(files, points, "stations", names=names, engine="cfgrib")
+        df = pd.read_parquet(store)
+
+    Parameters
+    ----------
+    files : list
+        Paths to the gridded files (GRIB2, NetCDF, etc.). All files must
+        be on the same grid.
+    points, names, dist_thresh, method, crs, index :
+        See ``pluck_points``. If ``index`` is None, it is built from the
+        first file.
+    store : str or pathlib.Path
+        Directory for the Parquet files. Read the whole time series with
+        ``pandas.read_parquet(store)``.
+    max_threads : int
+        Maximum number of files read at the same time.
+    verbose : bool
+        If True, print progress.
+    **open_kwargs
+        Keyword arguments for ``xarray.open_dataset`` (e.g.,
+        ``engine='cfgrib'``).
+
+    Returns
+    -------
+    pathlib.Path
+        The store directory.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    files = [Path(f) for f in files]
+    store = Path(store)
+    store.mkdir(parents=True, exist_ok=True)
+
+    def _dst(path):
+        key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:10]
+        return store / f"{path.stem}_{key}.parquet"
+
+    todo = [f for f in files if not _dst(f).exists()]
+    if verbose:
+        print(
+            f"🧵 Pluck [{len(todo):,}] files with [{max_threads=}] "
+            f"({len(files) - len(todo):,} already done)."
+        )
+    if not todo:
+        return store
+
+    if index is None:
+        assert points is not None, "👻 Must give `points` or `index`."
+        with xr.open_dataset(todo[0], **open_kwargs) as ds:
+            if "lat" in ds:
+                ds = ds.rename(dict(lat="latitude", lon="longitude"))
+            index = PointIndex.from_dataset(
+                ds, points, names=names, method=method, crs=crs
+            )
+
+    n_failed = np.sum(index.distance > dist_thresh)
+    if n_failed >= 1:
+        warnings.warn(f" 💀 Dropped {n_failed} point(s) that exceeded dist_thresh.")
+
+    failed = []
+    with ThreadPoolExecutor(max_threads) as exe:
+        # Keep at most 2*max_threads files in flight.
+        pending = {}
+        queue = iter(todo)
+        done = 0
+        while True:
+            for path in queue:
+                future = exe.submit(
+                    _pluck_file, path, index, dist_thresh, open_kwargs, _dst(path)
+                )
+                pending[future] = path
+                if len(pending) >= 2 * max_threads:
+                    break
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path = pending.pop(future)
+                done += 1
+                if future.exception() is not None:
+                    failed.append(path)
+                    warnings.warn(f" 💀 Could not pluck {path}: {future.exception()}")
+                if verbose:
+                    print(
+                        f"\r    ⏳ Finished [{done:,}/{len(todo):,}] files.", end="\r"
+                    )
+
+    if verbose:
+        print()
+    if failed:
+        warnings.warn(f" 💀 {len(failed):,} file(s) failed. Run again to retry them.")
+
+    return store
+
+
+def pluck_neighborhood(
+    ds,
+    points=None,
+    radius_km=20,
+    stats=("max", "mean", "count"),
+    names=None,
+    *,
+    index=None,
+):
+    """
+    Statistics of the grid values within a radius of each point.
+
+    For verification of fields like reflectivity or precipitation, the
+    value at the nearest grid point is often not what you want; instead,
+    you want the "max within 20 km of the station." The neighbors of
+    every point are found once with a KD-tree (stored in a PointIndex
+    with method='radius'), gathered in a single indexing operation, and
+    reduced for all points and time steps at once.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        The Dataset should include coordinates for both 'latitude' and
+        'longitude'.
+    points, names :
+        See ``pluck_points``.
+    radius_km : float
+        The neighborhood radius in kilometers.
+    stats : list of str
+        The statistics to compute. Any of 'max', 'min', 'mean',
+        'median', 'sum', 'std', or 'count' (the number of grid points
+        with data in the neighborhood).
+    index : PointIndex
+        A precomputed index built with method='radius'. When given,
+        ``points``, ``names`` and ``radius_km`` are taken from the index.
+
+    Returns
+    -------
+    xarray.Dataset
+        For each variable, a variable for each statistic named
+        ``{variable}_{stat}`` with dimensions (point, ...).
+    """
+    _stats = {"max", "min", "mean", "median", "sum", "std", "count"}
+    assert set(stats) <= _stats, f"stats must be any of {_stats}."
+
+    if "lat" in ds:
+        ds = ds.rename(dict(lat="latitude", lon="longitude"))
+
+    if index is None:
+        assert points is not None, "👻 Must give `points` or `index`."
+        index = PointIndex.from_dataset(
+            ds, points, names=names, method="radius", radius_km=radius_km
+        )
+    else:
+        assert index.method == "radius", "👻 `index` must use method='radius'."
+        index.check(ds)
+
+    # Gather every neighbor of every point in one indexing operation
+    stencil = np.unravel_index(index.stencil, index.shape)
+    neighbors = ds.isel(
+        {
+            dim: xr.DataArray(i, dims=("point", "stencil"))
+            for dim, i in zip(index.dims, stencil)
+        }
+    )
+    neighbors = neighbors.drop_vars(
+        [i for i in neighbors.coords if "stencil" in neighbors[i].dims]
+    )
+    in_radius = xr.DataArray(index.weights > 0, dims=("point", "stencil"))
+
+    out = xr.Dataset()
+    for var in neighbors.data_vars:
+        if "stencil" not in neighbors[var].dims:
+            continue
+        da = neighbors[var].where(in_radius)
+        for stat in stats:
+            out[f"{var}_{stat}"] = getattr(da, stat)("stencil")
+
+    out = out.transpose("point", ...)
+    out = out.assign_coords(
+        latitude=("point", index.points_lat),
+        longitude=("point", _normalized_longitude(index.points_lon)),
+    )
+    if index.names is not None:
+        out["point"] = index.names
+    out.attrs["radius_km"] = index.radius_km
+    return out
+
+
+def _great_circle_path(lons, lats, n_samples):
+    """
+    Sample points evenly spaced along a great-circle path.
+
+    The path goes through each waypoint in order. Points are spread
+    evenly over the total length of the path, so the first and last
+    samples are the first and last waypoints.
+
+    Parameters
+    ----------
+    lons, lats : array_like
+        Longitude and latitude of the waypoints.
+    n_samples : int
+        Number of points to sample along the path.
+
+    Returns
+    -------
+    Longitude, latitude, and distance along the path (m) of each sample.
+    """
+    xyz = _lonlat_to_xyz(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+    a, b = xyz[:-1], xyz[1:]
+
+    # Central angle of each segment, and where each segment starts
+    theta = np.arctan2(
+        np.linalg.norm(np.cross(a, b), axis=1), np.einsum("ij,ij->i", a, b)
+    )
+    start = np.concatenate([[0], np.cumsum(theta)])
+
+    along = np.linspace(0, start[-1], n_samples)
+    seg = np.clip(np.searchsorted(start, along, side="right") - 1, 0, len(theta) - 1)
+    f = (along - start[seg])[:, None]
+    t = theta[seg][:, None]
+
+    # Spherical linear interpolation within each segment
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w_a = np.where(t > 0, np.sin(t - f) / np.sin(t), 1)
+        w_b = np.where(t > 0, np.sin(f) / np.sin(t), 0)
+    p = w_a * a[seg] + w_b * b[seg]
+
+    lon = np.rad2deg(np.arctan2(p[:, 1], p[:, 0]))
+    lat = np.rad2deg(np.arcsin(np.clip(p[:, 2], -1, 1)))
+    return lon, lat, along * R * 1000
+
+
+def cross_section(ds, waypoints, n_samples=100, method="nearest", *, crs=None):
+    """
+    Extract a cross section along a great-circle path.
+
+    The path is sampled at ``n_samples`` evenly spaced points through
+    the waypoints, and all the samples are matched to the grid at once
+    (see ``PointIndex``). For 3-D model output, this gives a vertical
+    cross section with dimensions (..., level, distance).
+
+    .. code-block:: python
+
+        # Salt Lake City to Denver
+        xs = cross_section(ds, [(-111.9, 40.8), (-105.0, 39.7)], n_samples=200)
+        xs.t.plot(x="distance", y="isobaricInhPa")
+
+    Parameters
+    ----------
+    ds : xarray.Dataset or xarray.DataArray
+        Data with 'latitude' and 'longitude' (or 'lat' and 'lon')
+        coordinates.
+    waypoints : list of tuples
+        Two or more (lon, lat) points the path goes through.
+    n_samples : int
+        Number of points along the path.
+    method : {'nearest', 'bilinear'}
+        How to get values at each sample point.
+    crs : None, 'grib', or cartopy.crs.CRS
+        The projection the grid is regular in. See ``PointIndex``. If
+        'grib', the projection is built from the GRIB attributes of the
+        DataArray (or the Dataset variables).
 
     Returns
     -------
-    The Dataset values at the points nearest the requested lat/lon points.
+    The data along the path with a new 'distance' dimension (m from the
+    first waypoint) replacing the grid dimensions. Samples farther than
+    one grid spacing from the grid are NaN.
     """
+    _method = {"nearest", "bilinear"}
+    assert method in _method, f"method must be one of {_method}."
 
-    if len(points) > 8:
-        warnings.warn(
-            "If possible, use the herbie.tools.nearest_points method. It is *much* faster."
-        )
-
-    if "lat" in ds:
+    if "lat" in ds.coords:
         ds = ds.rename(dict(lat="latitude", lon="longitude"))
+    if isinstance(crs, str) and crs == "grib":
+        crs = _dataset_crs(ds)
 
-    if isinstance(points, tuple):
-        # If a tuple is give, turn into a one-item list.
-        points = [points]
+    w_lons, w_lats = _normalize_points(list(waypoints))
+    assert len(w_lons) >= 2, "Need at least two waypoints."
+    lon, lat, distance = _great_circle_path(w_lons, w_lats, n_samples)
 
-    if names is not None:
-        assert len(points) == len(names), "`points` and `names` must be same length."
+    index = PointIndex.from_dataset(
+        ds, np.column_stack([lon, lat]), method=method, crs=crs
+    )
+    spacing = _grid_spacing(*_grid_coords(ds["latitude"], ds["longitude"]))
+    ds = index.select(ds)
+    ds = ds.where(xr.DataArray(index.distance <= spacing, dims="point"))
+
+    ds = ds.rename(point="distance").assign_coords(
+        distance=("distance", distance, dict(units="m")),
+        latitude=("distance", lat),
+        longitude=("distance", lon),
+    )
+    return ds.transpose(..., "distance")
 
-    # Find the index for the nearest points
-    xs = []  # x index values
-    ys = []  # y index values
-    for point in points:
-        assert (
-            len(point) == 2
-        ), "``points`` should be a tuple or list of tuples (lon, lat)"
 
-        p_lon, p_lat = point
+def build_pyramid(da, factors=(2, 4, 8, 16), store=None, *, dims=None, chunks=512):
+    """
+    Build successively coarser versions of gridded data.
+
+    Each level is the block mean of the previous level (the 16x level is
+    the 2x2 mean of the 8x level, and so on), so the full-resolution data
+    is only read once. Blocks at the edge of the grid that are not full
+    are averaged over the points that are there.
+
+    Pick the coarsest level that still resolves what you need with
+    ``pyramid_level`` instead of coarsening full-resolution data every
+    time you make a map.
 
-        # Force longitude values to range from -180 to 180 degrees.
-        p_lon = _to_180(p_lon)
-        ds["longitude"][:] = _to_180(ds.longitude)
+    .. code-block:: python
 
-        # Find absolute difference between requested point and the grid coordinates.
-        abslat = np.abs(ds.latitude - p_lat)
-        abslon = np.abs(ds.longitude - p_lon)
+        pyramid = build_pyramid(ds.t2m, store="t2m_pyramid.zarr")
 
-        # Create grid of the maximum values of the two absolute grids
-        c = np.maximum(abslon, abslat)
+        # Later...
+        pyramid = open_pyramid("t2m_pyramid.zarr")
+        da = pyramid_level(pyramid, resolution=25_000)
+
+    Parameters
+    ----------
+    da : xarray.DataArray or xarray.Dataset
+        Gridded data.
+    factors : list of int
+        The coarsening factor of each level, relative to the original
+        grid. Each factor must be a multiple of the one before it.
+    store : None, str, or pathlib.Path
+        A Zarr store to write the levels to, one group per level. If
+        None, the levels are computed lazily and not saved.
+    dims : tuple
+        The two grid dimensions to coarsen. If None, the dimensions of
+        the 'latitude' and 'longitude' coordinates are used, or else the
+        last two dimensions.
+    chunks : int
+        Size of the chunks of the grid dimensions in the store.
 
-        # Find location where lat/lon minimum absolute value intersects
-        if ds.latitude.dims == ("y", "x"):
-            y, x = np.where(c == np.min(c))
-        elif ds.latitude.dims == ("x", "y"):
-            x, y = np.where(c == np.min(c))
+    Returns
+    -------
+    A dict of {factor: data}, including the original data as factor 1.
+    Each level has the attrs ``pyramid_factor`` and, if the data has
+    latitude and longitude, ``pyramid_resolution`` (grid spacing, m).
+    """
+    factors = sorted(factors)
+    steps = np.diff([1] + factors)
+    assert all(
+        f % prev == 0 for prev, f in zip([1] + factors, factors)
+    ), "Each factor must be a multiple of the one before it."
+    assert all(steps > 0), "Factors must be greater than 1 and unique."
+
+    if dims is None:
+        if "latitude" in da.coords and "longitude" in da.coords:
+            dims, _ = _grid_dims(*_grid_coords(da["latitude"], da["longitude"]))
         else:
-            raise ValueError(
-                f"Sorry, I do not understand dimensions {ds.latitude.dims}. Expected ('y', 'x')"
-            )
+            dims = da.dims[-2:]
+
+    spacing = None
+    if "latitude" in da.coords and "longitude" in da.coords:
+        spacing = _grid_spacing(*_grid_coords(da["latitude"], da["longitude"]))
+
+    def _tag(level, factor):
+        # A shallow copy; the data is not duplicated
+        attrs = dict(pyramid_factor=factor)
+        if spacing is not None:
+            attrs["pyramid_resolution"] = spacing * factor
+        return level.assign_attrs(attrs)
+
+    # The number of original grid points in each cell of the current
+    # level. Partial blocks at the edge are weighted by it, so the mean
+    # is over the points that are there, not a mean of means.
+    count = xr.DataArray(np.ones([da.sizes[d] for d in dims], "float32"), dims=dims)
+
+    pyramid = {1: _tag(da, 1)}
+    level, prev = da, 1
+    for factor in factors:
+        window = {d: factor // prev for d in dims}
+        total = (level * count).coarsen(window, boundary="pad").sum()
+        weight = (level.notnull() * count).coarsen(window, boundary="pad").sum()
+        count = count.coarsen(window, boundary="pad").sum()
+        # Blocks with no data (weight 0) are NaN
+        level = _tag(total / weight.where(weight > 0), factor)
+
+        if store is not None:
+            if isinstance(level, xr.DataArray):
+                ds = level.to_dataset(name=da.name or "data")
+                ds.attrs = {k: v for k, v in level.attrs.items() if "pyramid" in k}
+            else:
+                ds = level
+            ds = ds.chunk({d: min(chunks, ds.sizes[d]) for d in dims})
+            ds.to_zarr(store, group=f"factor_{factor}", mode="w")
+
+            # The next level is computed from what was just written
+            level = xr.open_zarr(store, group=f"factor_{factor}")
+            if isinstance(da, xr.DataArray):
+                level = level[da.name or "data"]
+
+        pyramid[factor] = level
+        prev = factor
+
+    return pyramid
+
+
+def open_pyramid(store):
+    """
+    Open the levels of a pyramid written by ``build_pyramid``.
 
-        xs.append(x[0])
-        ys.append(y[0])
+    Parameters
+    ----------
+    store : str or pathlib.Path
+        The Zarr store.
 
-    # ===================================================================
-    # Select Method 1:
-    # This method works, but returns more data than you ask for.
-    # It returns an NxN matrix where N is the number of points,
-    # and matches each point with each point (not just the coordinate
-    # pairs). The points you want will be along the diagonal.
-    # I leave this here so I remember not to do this.
-    #
-    # ds = ds.isel(x=xs, y=ys)
-    #
-    # ===================================================================
+    Returns
+    -------
+    A dict of {factor: Dataset}. The original data (factor 1) is not in
+    the store.
+    """
+    store = Path(store)
+    factors = sorted(int(i.name.split("_")[1]) for i in store.glob("factor_*"))
+    if not factors:
+        raise FileNotFoundError(f"👻 No pyramid levels in {store}")
+    return {f: xr.open_zarr(store, group=f"factor_{f}") for f in factors}
 
-    # ===================================================================
-    # Select Method 2:
-    # This is only *slightly* slower, but returns just the data at the
-    # points you requested. Creates a new dimension, called 'point'
-    ds = xr.concat([ds.isel(x=i, y=j) for i, j in zip(xs, ys)], dim="point")
-    # ===================================================================
 
-    # -------------------------------------------------------------------
-    # 📐Approximate the Great Circle distance between matched point and
-    # requested point.
-    # Based on https://andrew.hedges.name/experiments/haversine/
-    # -------------------------------------------------------------------
-    lat1 = np.deg2rad([i[1] for i in points])
-    lon1 = np.deg2rad([i[0] for i in points])
+def pyramid_level(pyramid, resolution):
+    """
+    Return the coarsest pyramid level with grid spacing of at most ``resolution``.
 
-    lat2 = np.deg2rad(ds.latitude.data)
-    lon2 = np.deg2rad(ds.longitude.data)
+    Parameters
+    ----------
+    pyramid : dict
+        Levels from ``build_pyramid`` or ``open_pyramid``.
+    resolution : int or float
+        The largest acceptable grid spacing (m). If no level is fine
+        enough, the finest level is returned.
+    """
+    levels = sorted(pyramid.items())
+    if not all("pyramid_resolution" in level.attrs for _, level in levels):
+        raise ValueError(
+            "👻 The pyramid levels have no 'pyramid_resolution'. Build the "
+            "pyramid from data with latitude and longitude, or pick a level "
+            "by its factor."
+        )
+    for factor, level in reversed(levels):
+        if level.attrs["pyramid_resolution"] <= resolution:
+            return level
+    return levels[0][1]
 
-    R = 6373.0  # approximate radius of earth in km
 
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
+class Regridder:
+    """
+    Regrid data from a curvilinear grid to another grid with sparse weights.
 
-    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    The weights from every source grid point to every target grid point
+    are computed once and stored as a sparse matrix (target cells x
+    source cells). Regridding is then a single sparse matrix product for
+    all the leading dimensions (time, level, etc.) at once. The weights
+    can be saved to disk and reloaded, so the geometry is never
+    recomputed for the same pair of grids.
 
-    distance = R * c * 1000  # converted to meters
+    .. code-block:: python
 
-    # Add the distance values as a coordinate
-    ds.coords["distance"] = ("point", distance)
-    ds["distance"].attrs = dict(
-        long_name="Distance between requested point and matched grid point", units="m"
-    )
+        regridder = Regridder(ds_hrrr, target, method="bilinear")
+        regridder.save("hrrr_to_latlon.npz")
 
-    # -------------------------------------------------------------------
-    # -------------------------------------------------------------------
+        regridder = Regridder.load("hrrr_to_latlon.npz")
+        ds_latlon = regridder(ds_hrrr)
+    """
 
-    # Add list of names as a coordinate
-    if hasattr(names, "__len__"):
-        # Assign the point dimension as the names.
-        assert len(ds.point) == len(
-            names
-        ), f"`names` must be same length as `points` pairs."
-        ds["point"] = names
+    def __init__(self, source, target, method="nearest", dist_thresh="auto", crs=None):
+        """
+        Compute the regridding weights.
+
+        Parameters
+        ----------
+        source : xarray.Dataset or xarray.DataArray
+            Data on the source grid, with 'latitude' and 'longitude'
+            coordinates (2-D, or 1-D for rectilinear grids).
+        target : xarray.Dataset, xarray.DataArray, or dict
+            The target grid. Must have 'latitude' and 'longitude', either
+            1-D (a regular lat/lon grid) or 2-D.
+        method : {'nearest', 'bilinear'}
+            How to map source values to the target grid points.
+        dist_thresh : 'auto', None, int or float
+            Target grid points farther than this (m) from the nearest
+            source grid point are outside the source grid and are set
+            to NaN. If 'auto' (default), the source grid spacing is used.
+            If None, every target point gets a value.
+        crs : None, 'grib', or cartopy.crs.CRS
+            The projection the source grid is regular in. See
+            ``PointIndex``. If 'grib', the projection is built from the
+            GRIB attributes of the source variables.
+        """
+        _method = {"nearest", "bilinear"}
+        assert method in _method, f"method must be one of {_method}."
+
+        if "lat" in source.coords:
+            source = source.rename(dict(lat="latitude", lon="longitude"))
+        if isinstance(crs, str) and crs == "grib":
+            crs = _dataset_crs(source)
+        src_lat, src_lon = _grid_coords(source["latitude"], source["longitude"])
+        self.source_dims, self.source_shape = _grid_dims(src_lat, src_lon)
+        self.source_fingerprint = _grid_fingerprint(src_lat, src_lon)
+
+        if isinstance(target, dict):
+            target = xr.Dataset(coords=target)
+        if "lat" in target.coords:
+            target = target.rename(dict(lat="latitude", lon="longitude"))
+        tgt_lat, tgt_lon = _grid_coords(target["latitude"], target["longitude"])
+        self.target_dims, self.target_shape = _grid_dims(tgt_lat, tgt_lon)
+        self.target_lat = np.asarray(tgt_lat)
+        self.target_lon = np.asarray(tgt_lon)
+        self.method = method
+
+        # Every target grid point as a (lon, lat) point
+        if self.target_lat.ndim == 1:
+            t_lon, t_lat = np.meshgrid(self.target_lon, self.target_lat)
+        else:
+            t_lon, t_lat = self.target_lon, self.target_lat
+        points = np.column_stack([t_lon.ravel(), t_lat.ravel()])
 
-    ## Print some info about each point:
-    if verbose:
-        p_lons = [i[0] for i in points]
-        p_lats = [i[1] for i in points]
-        g_lons = ds.longitude.data
-        g_lats = ds.latitude.data
-        distances = ds.distance.data
-        p_names = ds.point.data
-        zipped = zip(p_lons, p_lats, g_lons, g_lats, distances, p_names)
-        for plon, plat, glon, glat, d, name in zipped:
-            print(
-                f"🔎 Matched requested point [{name}] ({plat:.3f}, {plon:.3f}) to grid point ({glat:.3f}, {glon:.3f}). Distance of {d/1000:,.2f} km."
-            )
-            if d > dist_thresh:
-                print(f"   💀 Point [{name}] Failed distance threshold")
+        index = PointIndex.from_dataset(
+            source.coords.to_dataset(), points, method=method, crs=crs
+        )
 
-    ds.attrs["x_index"] = xs
-    ds.attrs["y_index"] = ys
+        if index.stencil is None:
+            stencil = np.ravel_multi_index(list(index.indices.values()), index.shape)[
+                :, None
+            ]
+            weights = np.ones(stencil.shape)
+        else:
+            stencil, weights = index.stencil, index.weights
+
+        if isinstance(dist_thresh, str) and dist_thresh == "auto":
+            dist_thresh = _grid_spacing(src_lat, src_lon)
+        valid = np.ones(len(points), dtype=bool)
+        if dist_thresh is not None:
+            valid = index.distance <= dist_thresh
+
+        n_target, k = stencil.shape
+        rows = np.repeat(np.arange(n_target), k).reshape(n_target, k)
+        self.weights = scipy.sparse.csr_matrix(
+            (weights[valid].ravel(), (rows[valid].ravel(), stencil[valid].ravel())),
+            shape=(n_target, int(np.prod(self.source_shape))),
+        )
+        self.valid = valid
 
-    # Drop points that do not meet the dist_thresh criteria
-    failed = ds.distance > dist_thresh
-    if np.sum(failed).data >= 1:
-        warnings.warn(
-            f" 💀 Dropped {np.sum(failed).data} point(s) that exceeded dist_thresh."
+    def __repr__(self):
+        return (
+            f"Regridder({self.method}: {self.source_dims}={self.source_shape} "
+            f"-> {self.target_dims}={self.target_shape}, "
+            f"{self.weights.nnz:,} weights)"
         )
-        ds = ds.where(~failed, drop=True)
 
-    return ds
+    def _regrid_numpy(self, data):
+        """Regrid a numpy array whose last two dims are the source grid."""
+        lead = data.shape[:-2]
+        data = data.reshape(-1, data.shape[-2] * data.shape[-1])
+        out = np.asarray(self.weights @ data.T).T
+        out[:, ~self.valid] = np.nan
+        return out.reshape(lead + self.target_shape)
+
+    def check(self, data):
+        """
+        Raise a ValueError if the weights were not built for this data's grid.
+
+        Data without 'latitude' and 'longitude' coordinates is not checked.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or xarray.Dataset
+        """
+        if "lat" in data.coords:
+            data = data.rename(dict(lat="latitude", lon="longitude"))
+        if "latitude" not in data.coords:
+            return
+        lat, lon = _grid_coords(data["latitude"], data["longitude"])
+        shape = _grid_dims(lat, lon)[1]
+        if shape != self.source_shape:
+            raise ValueError(
+                f"👻 Regridder was built for a {self.source_dims}={self.source_shape} "
+                f"grid, not {shape}."
+            )
+        fingerprint = _grid_fingerprint(lat, lon)
+        if fingerprint != self.source_fingerprint:
+            raise ValueError(
+                f"👻 Regridder was built for grid '{self.source_fingerprint}', "
+                f"but the data is on grid '{fingerprint}'."
+            )
+
+    def regrid(self, data, dask="parallelized"):
+        """
+        Regrid a DataArray or Dataset to the target grid.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or xarray.Dataset
+            Data on the source grid. Any number of leading dimensions
+            (time, level, etc.) is allowed. Variables of a Dataset that
+            are not on the source grid are returned unchanged.
+        dask : {'parallelized', 'forbidden'}
+            For dask-backed data, 'parallelized' (default) regrids each
+            chunk of the leading dimensions in parallel and lazily.
+        """
+        self.check(data)
+        if isinstance(data, xr.Dataset):
+            ds = data.map(
+                lambda da: (
+                    self._regrid(da, dask)
+                    if set(self.source_dims) <= set(da.dims)
+                    else da
+                )
+            )
+            return ds.drop_vars(
+                [i for i in ds.coords if set(ds[i].dims) & set(self.source_dims)],
+                errors="ignore",
+            ).assign_coords(self._target_coords())
+        return self._regrid(data, dask)
+
+    __call__ = regrid
+
+    def _regrid(self, data, dask):
+        """Regrid a DataArray (already checked) to the target grid."""
+        if "lat" in data.coords:
+            data = data.rename(dict(lat="latitude", lon="longitude"))
+        data = data.drop_vars(
+            [i for i in data.coords if set(data[i].dims) & set(self.source_dims)]
+        )
+        out = xr.apply_ufunc(
+            self._regrid_numpy,
+            data,
+            input_core_dims=[list(self.source_dims)],
+            output_core_dims=[[f"_target_{i}" for i in self.target_dims]],
+            dask=dask,
+            output_dtypes=[np.result_type(data.dtype, float)],
+            dask_gufunc_kwargs=dict(
+                output_sizes={
+                    f"_target_{i}": n
+                    for i, n in zip(self.target_dims, self.target_shape)
+                },
+                allow_rechunk=True,
+            ),
+        )
+        out = out.rename({f"_target_{i}": i for i in self.target_dims})
+        return out.assign_coords(self._target_coords())
+
+    def _target_coords(self):
+        """Coordinates of the target grid."""
+        if self.target_lat.ndim == 1:
+            return dict(zip(self.target_dims, (self.target_lat, self.target_lon)))
+        return dict(
+            latitude=(self.target_dims, self.target_lat),
+            longitude=(self.target_dims, self.target_lon),
+        )
+
+    def save(self, path):
+        """
+        Save the weights to a NumPy '.npz' file.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+        """
+        path = Path(path)
+        w = self.weights
+        np.savez(
+            path,
+            data=w.data,
+            indices=w.indices,
+            indptr=w.indptr,
+            shape=np.array(w.shape),
+            valid=self.valid,
+            method=self.method,
+            source_dims=np.array(self.source_dims),
+            source_shape=np.array(self.source_shape),
+            source_fingerprint=self.source_fingerprint,
+            target_dims=np.array(self.target_dims),
+            target_shape=np.array(self.target_shape),
+            target_lat=self.target_lat,
+            target_lon=self.target_lon,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load weights saved with ``Regridder.save``.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+        """
+        self = cls.__new__(cls)
+        with np.load(path) as f:
+            self.weights = scipy.sparse.csr_matrix(
+                (f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"])
+            )
+            self.valid = f["valid"]
+            self.method = str(f["method"])
+            self.source_dims = tuple(str(i) for i in f["source_dims"])
+            self.source_shape = tuple(int(i) for i in f["source_shape"])
+            self.source_fingerprint = str(f["source_fingerprint"])
+            self.target_dims = tuple(str(i) for i in f["target_dims"])
+            self.target_shape = tuple(int(i) for i in f["target_shape"])
+            self.target_lat = f["target_lat"]
+            self.target_lon = f["target_lon"]
+        return self
 
 
 def border(array, *, corner=0, direction="cw"):
     """
-    Extract the values around the border of a 2d array.
+    Extract the values around the border of an array.
 
     Default settings start from top left corner and move clockwise.
     Corners are only used once.
@@ -223,7 +2417,9 @@ def border(array, *, corner=0, direction="cw"):
     Parameters
     ----------
     array : array_like
-        A 2d array
+        An array whose last two dimensions are (y, x). Leading
+        dimensions (e.g., time for a moving nest) are kept. Dask-backed
+        arrays stay lazy.
     corner : {0, 1, 2, 3}
         Specify the corner to start at.
         0 - start at top left corner (default)
@@ -238,7 +2434,7 @@ def border(array, *, corner=0, direction="cw"):
     Returns
     -------
     border : ndarray
-        Values around the border of `array`.
+        Values around the border of `array`, with shape (..., n_border).
 
     Examples
     --------
@@ -262,31 +2458,36 @@ def border(array, *, corner=0, direction="cw"):
     >>> border(array, corner=2, direction='ccw')
     array([ 20,  15,  10,   5,   0,   0,   0,   0, 999,   1,   2,   3,   4,
              8,  12,  16,  20])
+    >>> border(np.stack([array, -array])).shape
+    (2, 17)
     """
+    if isinstance(array, xr.DataArray):
+        array = array.data
+    if not hasattr(array, "ndim"):
+        array = np.asarray(array)
+
     if corner > 0:
         # Rotate the array so we start on a different corner
-        array = np.rot90(array, k=corner)
+        array = np.rot90(array, k=corner, axes=(-2, -1))
     if direction == "ccw":
         # Transpose the array so we march around counter-clockwise
-        array = array.T
-
-    border = []
-    border += list(array[0, :-1])  # Top row (left to right), not the last element.
-    border += list(
-        array[:-1, -1]
-    )  # Right column (top to bottom), not the last element.
-    border += list(
-        array[-1, :0:-1]
-    )  # Bottom row (right to left), not the last element.
-    border += list(array[::-1, 0])  # Left column (bottom to top), all elements element.
-    # NOTE: in that last statement, we include the last element to close the path.
-
-    return np.array(border)
+        array = np.swapaxes(array, -2, -1)
+
+    return np.concatenate(
+        [
+            array[..., 0, :-1],  # Top row (left to right), not the last element.
+            array[..., :-1, -1],  # Right column (top to bottom), not the last element.
+            array[..., -1, :0:-1],  # Bottom row (right to left), not the last element.
+            array[..., ::-1, 0],  # Left column (bottom to top), all elements.
+        ],
+        axis=-1,
+    )
+    # NOTE: in that last slice, we include the last element to close the path.
 
 
 def corners(array, *, corner=0, direction="cw"):
     """
-    Get values at the four corners of a 2D array.
+    Get values at the four corners of an array.
 
     Default settings start from top left corner and moves around the
     array clockwise. Corners are only used once.
@@ -301,7 +2502,9 @@ def corners(array, *, corner=0, direction="cw"):
     Parameters
     ----------
     array : array_like
-        A 2d array
+        An array whose last two dimensions are (y, x). Leading
+        dimensions (e.g., time for a moving nest) are kept. Dask-backed
+        arrays stay lazy.
     corner : {0, 1, 2, 3}
         Specify the corner to start at.
         0 - start at top left corner (default)
@@ -316,7 +2519,7 @@ def corners(array, *, corner=0, direction="cw"):
     Returns
     -------
     corners : numpy.ndarray
-        Values at the corners of ``array``.
+        Values at the corners of ``array``, with shape (..., 4).
 
     Examples
     --------
@@ -332,22 +2535,95 @@ def corners(array, *, corner=0, direction="cw"):
         # Because indexing DataArrays behaves a bit different than numpy
         # arrays in this case, we convert the DataArray to a numpy array.
         array = array.data
+    if not hasattr(array, "ndim"):
+        array = np.asarray(array)
 
     if corner > 0:
         # Rotate the array so we start on a different corner
-        array = np.rot90(array, k=corner)
+        array = np.rot90(array, k=corner, axes=(-2, -1))
 
     if direction == "ccw":
         # Transpose the array so we march around counter-clockwise
-        array = array.T
+        array = np.swapaxes(array, -2, -1)
+
+    return np.stack(
+        [array[..., 0, 0], array[..., 0, -1], array[..., -1, -1], array[..., -1, 0]],
+        axis=-1,
+    )
 
-    return array[[0, 0, -1, -1], [0, -1, -1, 0]]
 
+def _outline_polygon(lons, lats, antimeridian="unwrap", tolerance=None):
+    """
+    Make a polygon from a domain outline that is safe at the dateline and poles.
 
-def border_polygon(ds, x="longitude", y="latitude"):
+    Parameters
+    ----------
+    lons, lats : array_like
+        Longitude and latitude of the outline, in order.
+    antimeridian : {'unwrap', 'split'}
+        - unwrap: longitudes are continuous, so a domain that crosses
+          the antimeridian has longitudes beyond 180 (e.g., 170 to 190).
+        - split: the polygon is cut at the antimeridian into a
+          MultiPolygon with longitudes in [-180, 180].
+    tolerance : None or float
+        If given, simplify the outline to this tolerance (degrees).
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    key = ("outline", _fingerprint(lons, lats), antimeridian, tolerance)
+
+    def _polygon():
+        lon, lat = lons, lats
+        if lon[0] != lon[-1] or lat[0] != lat[-1]:
+            # Close the path
+            lon, lat = np.append(lon, lon[0]), np.append(lat, lat[0])
+
+        # Remove jumps at the antimeridian, starting in [-180, 180)
+        lon = np.unwrap(lon, period=360)
+        lon = lon - 360 * np.floor((lon.min() + 180) / 360)
+
+        # An outline that goes all the way around the globe encloses a
+        # pole. Close the polygon along the pole's latitude.
+        split = antimeridian == "split"
+        if abs(lon[-1] - lon[0]) > 180:
+            pole = 90 if np.nanmean(lat) > 0 else -90
+            lon = np.append(lon, [lon[-1], lon[0]])
+            lat = np.append(lat, [pole, pole])
+            split = True
+
+        polygon = Polygon(zip(lon, lat))
+        if not polygon.is_valid:
+            polygon = shapely.make_valid(polygon)
+        if tolerance:
+            polygon = polygon.simplify(tolerance, preserve_topology=True)
+
+        if split and (polygon.bounds[0] < -180 or polygon.bounds[2] > 180):
+            # Cut into 360-degree wide pieces and shift each into [-180, 180]
+            pieces = [
+                shapely.affinity.translate(
+                    polygon.intersection(
+                        shapely.geometry.box(-180 + 360 * k, -90, 180 + 360 * k, 90)
+                    ),
+                    xoff=-360 * k,
+                )
+                for k in (-1, 0, 1, 2)
+            ]
+            polygon = shapely.union_all([p for p in pieces if not p.is_empty])
+        return polygon
+
+    return _cached(key, _polygon)
+
+
+def border_polygon(
+    ds, x="longitude", y="latitude", *, antimeridian="unwrap", tolerance=None
+):
     """
     Return the boundary of a grid as a polygon for the specified coordinates.
 
+    Domains that cross the antimeridian or include a pole give a valid
+    polygon. The polygon for each outline is cached, so calling this
+    again for the same grid is cheap.
+
     Parameters
     ----------
     ds : xarray.Dataset
@@ -355,17 +2631,30 @@ def border_polygon(ds, x="longitude", y="latitude"):
     x, y : str
         Specify the x an y coordinates to use. You might want to change
         these to 'lat' and 'lon' if that is what your Dataset has.
+    antimeridian : {'unwrap', 'split'}
+        - unwrap: longitudes are continuous, so a domain that crosses
+          the antimeridian has longitudes beyond 180 (default).
+        - split: cut the domain at the antimeridian into a MultiPolygon
+          with longitudes in [-180, 180].
+        A domain that includes a pole is always split.
+    tolerance : None or float
+        If given, simplify the outline to this tolerance (degrees). This
+        makes drawing the domain and testing points much faster.
 
     Returns
     -------
-    Shapely Polygon geometry.
+    Shapely Polygon (or MultiPolygon) geometry. Longitudes are in degrees
+    [-180, 180], unless the domain crosses the antimeridian and is not
+    split.
     """
-    lons = border(ds[x])
-    lats = border(ds[y])
-    return Polygon(zip(lons, lats))
+    return _outline_polygon(
+        border(ds[x]), border(ds[y]), antimeridian=antimeridian, tolerance=tolerance
+    )
 
 
-def corners_polygon(ds, x="longitude", y="latitude"):
+def corners_polygon(
+    ds, x="longitude", y="latitude", *, antimeridian="unwrap", tolerance=None
+):
     """
     Return the boundary of a grid as a polygon for the specified coordinates.
 
@@ -383,11 +2672,717 @@ def corners_polygon(ds, x="longitude", y="latitude"):
     x, y : str
         Specify the x an y coordinates to use. You might want to change
         these to 'lat' and 'lon' if that is what your Dataset has.
+    antimeridian : {'unwrap', 'split'}
+        See ``border_polygon``.
+    tolerance : None or float
+        See ``border_polygon``.
+
+    Returns
+    -------
+    Shapely Polygon (or MultiPolygon) geometry. Longitudes are in degrees
+    [-180, 180], unless the domain crosses the antimeridian and is not
+    split.
+    """
+    return _outline_polygon(
+        corners(ds[x]), corners(ds[y]), antimeridian=antimeridian, tolerance=tolerance
+    )
+
+
+def _polygon_mask(lat, lon, polygon):
+    """
+    Locate the grid points inside a polygon.
+
+    The grid is first cropped to the index box around the polygon's
+    bounds, then every grid point in the box is tested against the
+    polygon at once. The result is cached for the grid and polygon.
+
+    Parameters
+    ----------
+    lat, lon : array_like
+        Grid latitude and longitude, 2-D or 1-D (rectilinear grid).
+    polygon : shapely geometry
+        Polygon, MultiPolygon, or a GeometryCollection of them (like
+        ``cartopy_tools.state_polygon``), in lon/lat degrees.
+
+    Returns
+    -------
+    A tuple of slices for the grid's index box and a read-only boolean
+    mask of the points inside the polygon within that box.
+    """
+    lat = np.asarray(lat)
+    lon = np.asarray(lon)
+    key = ("polygon_mask", _grid_fingerprint(lat, lon), polygon.wkb)
+
+    def _mask():
+        minx, miny, maxx, maxy = polygon.bounds
+        g_lon = _normalized_longitude(lon, _longitude_convention([minx, maxx]))
+        g_lat = lat
+        if lat.ndim == 1:
+            g_lat, g_lon = lat[:, None], g_lon[None, :]
+
+        in_box = (g_lon >= minx) & (g_lon <= maxx) & (g_lat >= miny) & (g_lat <= maxy)
+        rows = np.flatnonzero(in_box.any(axis=1))
+        cols = np.flatnonzero(in_box.any(axis=0))
+        if not len(rows) or not len(cols):
+            raise ValueError("👻 The polygon does not overlap the grid.")
+        box = slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+
+        if lat.ndim == 1:
+            # Crop each 1-D axis on its own; the added axes have length 1
+            g_lat, g_lon = g_lat[box[0]], g_lon[:, box[1]]
+        else:
+            g_lat, g_lon = g_lat[box], g_lon[box]
+        g_lat, g_lon = np.broadcast_arrays(g_lat, g_lon)
+        mask = np.zeros(g_lat.shape, dtype=bool)
+        for geom in getattr(polygon, "geoms", [polygon]):
+            mask |= shapely.intersects_xy(geom, g_lon, g_lat)
+        return box, _read_only(mask)
+
+    return _cached(key, _mask)
+
+
+def mask_polygon(ds, polygon, *, crop=True, x="longitude", y="latitude"):
+    """
+    Mask grid points outside a polygon.
+
+    The grid is cropped to the polygon's bounding index box and values
+    outside the polygon are set to NaN. The mask is cached for each grid
+    and polygon, so masking many files or time steps on the same grid
+    only computes it once.
+
+    .. code-block:: python
+
+        utah = state_polygon("UT")
+        ds_utah = mask_polygon(ds, utah)
+
+    Parameters
+    ----------
+    ds : xarray.Dataset or xarray.DataArray
+        Data with 2-D 'latitude' and 'longitude' coordinates, or 1-D
+        coordinates for a rectilinear grid.
+    polygon : shapely geometry
+        Polygon, MultiPolygon, or GeometryCollection in lon/lat degrees,
+        like from ``border_polygon`` or ``cartopy_tools.state_polygon``.
+    crop : bool
+        If True (default), crop the grid to the polygon's index box.
+        If False, return the full grid.
+    x, y : str
+        Specify the x an y coordinates to use. You might want to change
+        these to 'lat' and 'lon' if that is what your Dataset has.
+    """
+    lat, lon = _grid_coords(ds[y], ds[x])
+    dims, shape = _grid_dims(lat, lon)
+    box, mask = _polygon_mask(lat, lon, polygon)
+
+    if crop:
+        ds = ds.isel(dict(zip(dims, box)))
+    else:
+        full = np.zeros(shape, dtype=bool)
+        full[box] = mask
+        mask = full
+
+    return ds.where(xr.DataArray(mask, dims=dims))
+
+
+def _grid_cells(lat, lon, bounds):
+    """
+    Build a polygon for each grid cell that may overlap the bounds.
+
+    Cell edges are halfway between grid points (see
+    ``_infer_interval_breaks``).
+
+    Parameters
+    ----------
+    lat, lon : numpy.ndarray
+        2-D grid latitude and longitude.
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the area of interest.
+
+    Returns
+    -------
+    The flat index of each cell and an array of cell polygons.
+    """
+    lat_b = _infer_interval_breaks(lat)
+    lon_b = _infer_interval_breaks(lon)
+
+    # Corners of every cell, counter-clockwise
+    corners_lon = np.stack(
+        [lon_b[:-1, :-1], lon_b[:-1, 1:], lon_b[1:, 1:], lon_b[1:, :-1]], axis=-1
+    ).reshape(-1, 4)
+    corners_lat = np.stack(
+        [lat_b[:-1, :-1], lat_b[:-1, 1:], lat_b[1:, 1:], lat_b[1:, :-1]], axis=-1
+    ).reshape(-1, 4)
+
+    minx, miny, maxx, maxy = bounds
+    keep = (
+        (corners_lon.max(axis=1) >= minx)
+        & (corners_lon.min(axis=1) <= maxx)
+        & (corners_lat.max(axis=1) >= miny)
+        & (corners_lat.min(axis=1) <= maxy)
+        # Cells split by the longitude seam are skipped
+        & (np.ptp(corners_lon, axis=1) < 180)
+    )
+    cells = np.flatnonzero(keep)
+    coords = np.stack([corners_lon[cells], corners_lat[cells]], axis=-1)
+    return cells, shapely.polygons(coords)
+
+
+class ZonalStatistics:
+    """
+    Area-weighted statistics of gridded data for many regions at once.
+
+    The fraction of each grid cell covered by each region is computed
+    once and stored as a sparse matrix (regions x grid cells). The
+    statistics for every region and every time step are then a single
+    sparse matrix product.
+
+    .. code-block:: python
+
+        regions = {s: state_polygon(s, verbose=False) for s in ["UT", "CO", "WY"]}
+        zonal = ZonalStatistics(ds, regions)
+        ds_states = zonal(ds, stats=("mean", "max"))
+    """
+
+    def __init__(self, ds, regions, names=None, x="longitude", y="latitude"):
+        """
+        Compute the overlap of grid cells and regions.
+
+        Parameters
+        ----------
+        ds : xarray.Dataset or xarray.DataArray
+            Data with 2-D 'latitude' and 'longitude' coordinates, or 1-D
+            coordinates for a rectilinear grid.
+        regions : dict or list of shapely geometries
+            Regions in lon/lat degrees, like from ``border_polygon`` or
+            ``cartopy_tools.state_polygon``. If a dict, the keys are the
+            region names.
+        names : list
+            Names for each region, if ``regions`` is a list.
+        x, y : str
+            Specify the x an y coordinates to use.
+        """
+        if isinstance(regions, dict):
+            names, regions = list(regions), list(regions.values())
+        if names is None:
+            names = list(range(len(regions)))
+        assert len(names) == len(regions), "`regions` and `names` must be same length."
+        self.names = names
+
+        # Collections (e.g., from state_polygon) are merged to one shape
+        regions = np.array(
+            [
+                shapely.union_all(r.geoms) if r.geom_type == "GeometryCollection" else r
+                for r in regions
+            ],
+            dtype=object,
+        )
+
+        lat, lon = _grid_coords(ds[y], ds[x])
+        self.dims, self.shape = _grid_dims(lat, lon)
+        self.x, self.y = x, y
+        self.fingerprint = _grid_fingerprint(lat, lon)
+        lat, lon = np.asarray(lat), np.asarray(lon)
+
+        bounds = shapely.total_bounds(regions)
+        lon = _normalized_longitude(lon, _longitude_convention(bounds[::2]))
+        if lat.ndim == 1:
+            lon, lat = np.meshgrid(lon, lat)
+
+        cells, polygons = _grid_cells(lat, lon, bounds)
+        region_i, cell_i = shapely.STRtree(polygons).query(
+            regions, predicate="intersects"
+        )
+        cell_area = shapely.area(polygons)
+
+        # Only cells on a region's edge need the (slow) intersection
+        shapely.prepare(regions)
+        fraction = np.ones(len(cell_i))
+        edge = ~shapely.contains(regions[region_i], polygons[cell_i])
+        fraction[edge] = (
+            shapely.area(
+                shapely.intersection(regions[region_i[edge]], polygons[cell_i[edge]])
+            )
+            / cell_area[cell_i[edge]]
+        )
+        keep = fraction > 0
+        region_i, cell_i, fraction = region_i[keep], cell_i[keep], fraction[keep]
+
+        n_cells = int(np.prod(self.shape))
+        self.fraction = scipy.sparse.csr_matrix(
+            (fraction, (region_i, cells[cell_i])), shape=(len(regions), n_cells)
+        )
+        self.fraction.sort_indices()
+
+        # Cells get smaller toward the poles
+        area = np.zeros(n_cells)
+        area[cells] = cell_area * np.cos(np.deg2rad(lat.ravel()[cells]))
+        self.weights = self.fraction.multiply(area).tocsr()
+
+    def __repr__(self):
+        return (
+            f"ZonalStatistics({len(self.names)} regions on "
+            f"{self.dims}={self.shape}, {self.fraction.nnz:,} overlapping cells)"
+        )
+
+    def _statistics(self, data, stats):
+        """Statistics for a numpy array whose last two dims are the grid."""
+        lead = data.shape[:-2]
+        data = data.reshape(-1, data.shape[-2] * data.shape[-1])
+        valid = np.isfinite(data)
+        filled = np.where(valid, data, 0)
+
+        out = []
+        for stat in stats:
+            if stat == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    x = (self.weights @ filled.T) / (self.weights @ valid.T)
+                x = x.T
+            elif stat == "sum":
+                x = (self.fraction @ filled.T).T
+            else:
+                # Reduce over each region's cells (the rows of the CSR matrix)
+                x = np.full((len(data), len(self.names)), np.nan)
+                f = self.fraction
+                nonempty = np.diff(f.indptr) > 0
+                reduce = np.fmax if stat == "max" else np.fmin
+                x[:, nonempty] = reduce.reduceat(
+                    data[:, f.indices], f.indptr[:-1][nonempty], axis=1
+                )
+            out.append(x.reshape(lead + (len(self.names),)))
+        return tuple(out)
+
+    def compute(self, ds, stats=("mean", "max", "sum"), dask="parallelized"):
+        """
+        Compute statistics for every region.
+
+        Parameters
+        ----------
+        ds : xarray.Dataset or xarray.DataArray
+            Data on the same grid the ZonalStatistics was built for. If
+            it has the grid's coordinates, they must be the same.
+        stats : list of {'mean', 'max', 'min', 'sum'}
+            The statistics to compute. 'mean' is weighted by the area of
+            each cell inside the region; 'sum' is the sum of the cell
+            values times the fraction of each cell inside the region.
+            Missing values are ignored.
+        dask : {'parallelized', 'forbidden'}
+            For dask-backed data, 'parallelized' (default) computes the
+            statistics lazily for each chunk of the leading dimensions.
+
+        Returns
+        -------
+        A Dataset with variables named like ``{var}_{stat}`` and
+        dimensions ('region', ...).
+        """
+        _stats = {"mean", "max", "min", "sum"}
+        assert set(stats) <= _stats, f"stats must be in {_stats}"
+
+        if isinstance(ds, xr.DataArray):
+            ds = ds.to_dataset(name=ds.name or "data")
+
+        if tuple(ds[i].size for i in self.dims) != self.shape:
+            raise ValueError(
+                f"👻 ZonalStatistics was built for a {self.dims}={self.shape} grid."
+            )
+        if self.y in ds.coords and self.x in ds.coords:
+            fingerprint = _grid_fingerprint(*_grid_coords(ds[self.y], ds[self.x]))
+            if fingerprint != self.fingerprint:
+                raise ValueError(
+                    f"👻 ZonalStatistics was built for grid '{self.fingerprint}', "
+                    f"but the data is on grid '{fingerprint}'."
+                )
+
+        ds = ds.drop_vars([i for i in ds.coords if set(ds[i].dims) & set(self.dims)])
+        out = xr.Dataset()
+        for name, da in ds.data_vars.items():
+            if not set(self.dims) <= set(da.dims):
+                continue
+            results = xr.apply_ufunc(
+                self._statistics,
+                da,
+                kwargs=dict(stats=stats),
+                input_core_dims=[list(self.dims)],
+                output_core_dims=[["region"]] * len(stats),
+                dask=dask,
+                output_dtypes=[float] * len(stats),
+                dask_gufunc_kwargs=dict(
+                    output_sizes={"region": len(self.names)}, allow_rechunk=True
+                ),
+            )
+            for stat, result in zip(stats, results):
+                out[f"{name}_{stat}"] = result.transpose("region", ...)
+
+        return out.assign_coords(region=self.names)
+
+    __call__ = compute
+
+
+# ======================================================================
+# Grid registry
+# ======================================================================
+GRID_CACHE = Path(
+    os.getenv("CARPENTER_GRID_CACHE", "~/.local/share/Carpenter_Workshop/grids")
+).expanduser()
+
+# GRIB attributes that describe the grid (not the variable)
+_GRID_ATTRS = {
+    "GRIB_gridType",
+    "GRIB_Nx",
+    "GRIB_Ny",
+    "GRIB_DxInMetres",
+    "GRIB_DyInMetres",
+    "GRIB_LaDInDegrees",
+    "GRIB_LoVInDegrees",
+    "GRIB_Latin1InDegrees",
+    "GRIB_Latin2InDegrees",
+    "GRIB_orientationOfTheGridInDegrees",
+    "GRIB_southPoleOnProjectionPlane",
+    "GRIB_latitudeOfFirstGridPointInDegrees",
+    "GRIB_longitudeOfFirstGridPointInDegrees",
+    "GRIB_shapeOfTheEarth",
+}
+
+
+def _grid_attrs(ds):
+    """Return the GRIB grid attributes of the first variable that has them."""
+    for var in getattr(ds, "data_vars", []):
+        attrs = {k: v for k, v in ds[var].attrs.items() if k in _GRID_ATTRS}
+        if attrs:
+            return {k: v.item() if hasattr(v, "item") else v for k, v in attrs.items()}
+    return {}
+
+
+def register_grid(ds, name, *, cache_dir=None):
+    """
+    Save the coordinates of a grid to the grid registry.
+
+    The latitude, longitude, domain border, and the unit-sphere
+    coordinates used for point matching are saved as ``.npy`` files.
+    ``open_grid`` opens them as memory maps, so the coordinates are
+    never decoded again and processes on the same machine share the
+    same memory for them.
+
+    .. code-block:: python
+
+        register_grid(xr.open_dataset("hrrr.grib2", engine="cfgrib"), "hrrr")
+
+        grid = open_grid("hrrr")
+        pluck_points(grid, points)
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        A Dataset with 'latitude' and 'longitude' coordinates. GRIB grid
+        attributes (e.g., the Lambert projection) are kept.
+    name : str
+        Name of the grid, like 'hrrr' or 'rap'.
+    cache_dir : None, str, or pathlib.Path
+        The registry directory. Default is ``GRID_CACHE``, which may be
+        set by the ``CARPENTER_GRID_CACHE`` environment variable.
+
+    Returns
+    -------
+    The directory the grid was saved to.
+    """
+    lat, lon = _grid_coords(ds["latitude"], ds["longitude"])
+    dims, shape = _grid_dims(lat, lon)
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(_normalized_longitude(lon), dtype=float)
+    if lat.ndim == 1:
+        lon2d, lat2d = np.meshgrid(lon, lat)
+    else:
+        lon2d, lat2d = lon, lat
+
+    grid_dir = Path(cache_dir or GRID_CACHE) / name
+    grid_dir.mkdir(parents=True, exist_ok=True)
+
+    arrays = dict(
+        latitude=lat,
+        longitude=lon,
+        border_latitude=border(lat2d),
+        border_longitude=_outline_longitude(border(lon2d)),
+        xyz=_lonlat_to_xyz(lon2d.ravel(), lat2d.ravel()),
+    )
+    for key, array in arrays.items():
+        # Write to a temporary file first so readers never see a partial file
+        tmp = grid_dir / f"{key}.tmp.npy"
+        np.save(tmp, array)
+        tmp.replace(grid_dir / f"{key}.npy")
+
+    meta = dict(
+        name=name,
+        dims=list(dims),
+        shape=list(shape),
+        fingerprint=_grid_fingerprint(lat, lon),
+        attrs=_grid_attrs(ds),
+    )
+    (grid_dir / "grid.json").write_text(json.dumps(meta, indent=2))
+    return grid_dir
+
+
+def registered_grids(*, cache_dir=None):
+    """
+    Return the names of the grids in the registry.
+
+    Parameters
+    ----------
+    cache_dir : None, str, or pathlib.Path
+        The registry directory. Default is ``GRID_CACHE``.
+    """
+    return sorted(
+        i.parent.name for i in Path(cache_dir or GRID_CACHE).glob("*/grid.json")
+    )
+
+
+def open_grid(name, *, cache_dir=None):
+    """
+    Open a grid from the registry with memory-mapped coordinates.
+
+    Parameters
+    ----------
+    name : str
+        Name the grid was registered with.
+    cache_dir : None, str, or pathlib.Path
+        The registry directory. Default is ``GRID_CACHE``.
+
+    Returns
+    -------
+    A Dataset with read-only, memory-mapped 'latitude' and 'longitude'
+    coordinates (longitude in degrees [-180, 180]) and the domain
+    outline as 'border_latitude' and 'border_longitude'. The outline
+    variables carry the grid's GRIB attributes, so ``crs='grib'`` works
+    for ``PointIndex`` and ``pluck_points``.
+    """
+    grid_dir = Path(cache_dir or GRID_CACHE) / name
+    if not (grid_dir / "grid.json").exists():
+        raise FileNotFoundError(
+            f"👻 Grid '{name}' is not registered in {grid_dir.parent}. "
+            f"Registered grids: {registered_grids(cache_dir=cache_dir)}"
+        )
+    meta = json.loads((grid_dir / "grid.json").read_text())
+
+    def _load(key):
+        return np.load(grid_dir / f"{key}.npy", mmap_mode="r")
+
+    dims = tuple(meta["dims"])
+    lat, lon = _load("latitude"), _load("longitude")
+    if lat.ndim == 1:
+        coords = {dims[0]: lat, dims[1]: lon}
+    else:
+        coords = dict(latitude=(dims, lat), longitude=(dims, lon))
+
+    # Point matching on this grid uses the saved unit-sphere coordinates
+    _cached(("xyz", meta["fingerprint"]), lambda: _load("xyz"))
+
+    return xr.Dataset(
+        {
+            "border_latitude": ("border", _load("border_latitude"), meta["attrs"]),
+            "border_longitude": ("border", _load("border_longitude"), meta["attrs"]),
+        },
+        coords=coords,
+        attrs=dict(grid_name=name, grid_fingerprint=meta["fingerprint"]),
+    )
+
+
+def _grid_corners(lat, lon):
+    """The corner values of grid latitude and (normalized) longitude DataArrays."""
+    lat = np.asarray(lat.isel({d: [0, -1] for d in lat.dims}), dtype=float)
+    lon = np.asarray(lon.isel({d: [0, -1] for d in lon.dims}), dtype=float)
+    return lat, _to_180(lon)
+
+
+def _same_grid(attrs, corners, name, meta, cache_dir):
+    """Whether GRIB grid attributes or corner coordinates match a registered grid."""
+    if attrs and meta["attrs"]:
+        return attrs == meta["attrs"]
+    if corners is None:
+        # Same shape is not enough to know it's the same grid
+        return False
+    grid = open_grid(name, cache_dir=cache_dir)
+    expected = _grid_corners(grid["latitude"], grid["longitude"])
+    return all(np.allclose(a, b) for a, b in zip(corners, expected))
+
+
+def use_registered_grid(ds, name=None, *, cache_dir=None):
+    """
+    Replace a Dataset's coordinates with those of a matching registered grid.
+
+    A registered grid matches if it has the same dimensions and shape,
+    and either
+
+    - both ``ds`` and the registered grid have GRIB grid attributes and
+      they are the same, so the coordinates of ``ds`` don't need to be
+      read, or
+    - the corner coordinates of ``ds`` are the same as the grid's.
+
+    Data without GRIB grid attributes or coordinates (e.g., a NetCDF
+    file with only x and y) can't be matched safely; give the grid
+    ``name`` instead.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        A Dataset on a registered grid. It does not need to have
+        latitude and longitude.
+    name : str, optional
+        Use this registered grid. Its dimensions and shape must match.
+    cache_dir : None, str, or pathlib.Path
+        The registry directory. Default is ``GRID_CACHE``.
+
+    Returns
+    -------
+    The Dataset with memory-mapped coordinates, or ``ds`` unchanged if
+    no registered grid matches.
+    """
+    if "lat" in ds.coords:
+        ds = ds.rename(dict(lat="latitude", lon="longitude"))
+    attrs = _grid_attrs(ds)
+    corners = None
+    if "latitude" in ds.coords and "longitude" in ds.coords:
+        corners = _grid_corners(*_grid_coords(ds["latitude"], ds["longitude"]))
+
+    names = registered_grids(cache_dir=cache_dir) if name is None else [name]
+    for grid_name in names:
+        grid_dir = Path(cache_dir or GRID_CACHE) / grid_name
+        if not (grid_dir / "grid.json").exists():
+            # Raises FileNotFoundError with the registered grid names
+            open_grid(grid_name, cache_dir=cache_dir)
+        meta = json.loads((grid_dir / "grid.json").read_text())
+        dims = tuple(meta["dims"])
+        if not all(ds.sizes.get(d) == n for d, n in zip(dims, meta["shape"])):
+            if name is not None:
+                raise ValueError(
+                    f"👻 Grid '{name}' is {dims}={tuple(meta['shape'])}, "
+                    f"which doesn't match the Dataset {dict(ds.sizes)}."
+                )
+            continue
+        if name is None and not _same_grid(attrs, corners, grid_name, meta, cache_dir):
+            continue
+
+        grid = open_grid(grid_name, cache_dir=cache_dir)
+        ds = ds.drop_vars(["latitude", "longitude"], errors="ignore")
+        return ds.assign_coords(grid.coords)
+    return ds
+
+
+def _natural_earth_land(scale):
+    """Return an array of the Natural Earth land polygons."""
+    import cartopy.io.shapereader as shpreader
+
+    path = shpreader.natural_earth(resolution=scale, category="physical", name="land")
+    return np.array(list(shpreader.Reader(path).geometries()), dtype=object)
+
+
+def land_sea_mask(
+    ds,
+    scale="50m",
+    *,
+    subsample=1,
+    land=None,
+    cache_dir=None,
+    x="longitude",
+    y="latitude",
+):
+    """
+    Return the fraction of each grid cell that is land.
+
+    Natural Earth land polygons are rasterized onto the grid by testing
+    all grid points against the (prepared) land geometry at once.
+    With ``subsample`` > 1, each grid cell is sampled at
+    ``subsample x subsample`` points to estimate the fraction of the
+    cell that is land. The mask is saved to disk for each grid, so
+    getting the mask for the same grid again only loads a file.
+
+    .. code-block:: python
+
+        land = land_sea_mask(ds, subsample=3)
+        ds_land = ds.where(land > 0.5)
+
+    Parameters
+    ----------
+    ds : xarray.Dataset or xarray.DataArray
+        Data with 2-D 'latitude' and 'longitude' coordinates, or 1-D
+        coordinates for a rectilinear grid.
+    scale : {'10m', '50m', '110m'}
+        Natural Earth resolution.
+    subsample : int
+        Number of samples along each side of a grid cell. If 1 (default),
+        the mask is 1 where the grid point is on land and 0 otherwise.
+    land : list of shapely geometries
+        Use these polygons for land instead of Natural Earth.
+    cache_dir : None, str, or pathlib.Path
+        Where to save the masks. Default is
+        ``GRID_CACHE / "land_sea_mask"``.
+    x, y : str
+        Specify the x an y coordinates to use. You might want to change
+        these to 'lat' and 'lon' if that is what your Dataset has.
 
     Returns
     -------
-    Shapely Polygon geometry.
+    A DataArray of land fraction [0, 1] on the grid dimensions.
     """
-    lons = corners(ds[x])
-    lats = corners(ds[y])
-    return Polygon(zip(lons, lats))
+    lat, lon = _grid_coords(ds[y], ds[x])
+    dims, shape = _grid_dims(lat, lon)
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+
+    if land is None:
+        source = f"Natural Earth {scale} land"
+        key = scale
+    else:
+        source = "user-supplied land polygons"
+        key = hashlib.sha1(b"".join(shapely.to_wkb(list(land)))).hexdigest()[:10]
+    cache_dir = Path(cache_dir or GRID_CACHE / "land_sea_mask")
+    path = cache_dir / f"land_{key}_x{subsample}_{_grid_fingerprint(lat, lon)}.npy"
+
+    if path.exists():
+        fraction = np.load(path, mmap_mode="r")
+    else:
+        if land is None:
+            land = _natural_earth_land(scale)
+
+        # One prepared geometry tests millions of points quickly
+        land = shapely.union_all(np.asarray(land, dtype=object))
+        shapely.prepare(land)
+
+        if lat.ndim == 1:
+            lon, lat = np.meshgrid(lon, lat)
+        if subsample > 1:
+            lat_b = _infer_interval_breaks(lat)
+            lon_b = _infer_interval_breaks(lon)
+
+        hits = np.zeros(lat.size)
+        offsets = (np.arange(subsample) + 0.5) / subsample
+        for a in offsets if subsample > 1 else [None]:
+            for b in offsets if subsample > 1 else [None]:
+                if a is None:
+                    s_lat, s_lon = lat, lon
+                else:
+                    # Bilinear position within the cell's corners
+                    def _within(c):
+                        return (
+                            (1 - a) * (1 - b) * c[:-1, :-1]
+                            + (1 - a) * b * c[:-1, 1:]
+                            + a * (1 - b) * c[1:, :-1]
+                            + a * b * c[1:, 1:]
+                        )
+
+                    s_lat, s_lon = _within(lat_b), _within(lon_b)
+                hits += shapely.intersects_xy(
+                    land, _to_180(s_lon).ravel(), s_lat.ravel()
+                )
+
+        fraction = (hits / max(subsample, 1) ** 2).reshape(shape).astype(np.float32)
+
+        # Write to a temporary file first so readers never see a partial file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npy")
+        np.save(tmp, fraction)
+        tmp.replace(path)
+
+    return xr.DataArray(
+        fraction,
+        dims=dims,
+        coords={i: ds[i] for i in (y, x)},
+        name="land_fraction",
+        attrs=dict(long_name="Fraction of grid cell that is land", source=source),
+    )
@@ -27,18 +27,42 @@ Class for doing embarrassingly parallel tasks fast!
     ezpz.multipro()
     ezpz.dask_delayed()
 
+    # Stream (index, result) pairs as tasks finish
+    for i, result in ezpz.iter(backend="threads", ordered=False):
+        print(i, result)
+
+    # Send large arrays to the processes through shared memory
+    ezpz.multipro(shared_memory=True)
+
+    # Keep the workers alive between calls
+    with ParallelSession(max_workers=8, start_method="spawn", preload=["xarray"]):
+        for hour in range(24):
+            EasyParallel(my_func, range(100), e=hour).multipro()
+
 
 Resources
 ---------
 - https://superfastpython.com/parallel-nested-for-loops-in-python/
 
 """
+import importlib
+import io
 import multiprocessing
-from multiprocessing.dummy import Pool as ThreadPool  # Multithreading
+import multiprocessing.dummy  # Thread names
+import pickle
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+from itertools import count, islice
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-from concurrent.futures import as_completed, wait
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
 from datetime import datetime
 
+import numpy as np
+
 try:
     import dask
 except Exception as e:
@@ -47,6 +71,227 @@ except Exception as e:
     # print("Without dask, you cannot use dask for multiprocessing.")
 
 
+def _as_args(args):
+    """Return the arguments for one task as a sequence to unpack."""
+    if isinstance(args, (str, bytes)) or not hasattr(args, "__len__"):
+        return [args]
+    return args
+
+
+# ======================================================================
+# Shared memory transport
+# ======================================================================
+# NumPy arrays at least this large (bytes) are put in shared memory when
+# ``shared_memory=True``. Smaller arrays are cheaper to pickle.
+SHARED_MEMORY_MIN_BYTES = 1_000_000
+
+
+def _untrack(shm):
+    """
+    Stop this process's resource tracker from cleaning up a block.
+
+    Attaching to a block registers it with the resource tracker, which
+    would unlink it (or warn) when this process exits. Only the process
+    that owns a block should unlink it.
+    """
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def _attach_array(name, shape, dtype):
+    """Unpickle an array from a shared memory block as a read-only view."""
+    shm = SharedMemory(name=name)
+    _untrack(shm)
+    _attached.append(shm)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    array.flags.writeable = False
+    return array
+
+
+def _copy_array(name, shape, dtype):
+    """Unpickle an array from a shared memory block, then free the block."""
+    shm = SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# Blocks this process has attached to for the current task
+_attached = []
+
+
+class _SharedPickler(pickle.Pickler):
+    """
+    Pickle large NumPy arrays as references to shared memory blocks.
+
+    Arrays anywhere in the object (including the data of xarray objects)
+    are copied to a block, and only the block name, shape and dtype are
+    pickled. The names of the blocks used are in ``self.blocks``, and
+    the names of the blocks made by this pickler in ``self.created``.
+    If ``owner`` is False, another process is responsible for freeing
+    the blocks.
+
+    ``shared`` maps ``id(array)`` to ``(array, block name)`` for arrays
+    already in shared memory, so an array pickled many times (e.g., with
+    every task) is only copied to a block once. New blocks are added.
+    """
+
+    def __init__(self, file, loader=_attach_array, owner=True, shared=None):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.loader = loader
+        self.owner = owner
+        self.shared = shared
+        self.blocks = []
+        self.created = []
+
+    def reducer_override(self, obj):
+        if (
+            type(obj) is np.ndarray
+            and not obj.dtype.hasobject
+            and obj.nbytes >= SHARED_MEMORY_MIN_BYTES
+        ):
+            if self.shared is not None and id(obj) in self.shared:
+                name = self.shared[id(obj)][1]
+            else:
+                shm = SharedMemory(create=True, size=obj.nbytes)
+                name = shm.name
+                self.created.append(name)
+                np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)[...] = obj
+                shm.close()
+                if not self.owner:
+                    _untrack(shm)
+                if self.shared is not None:
+                    # Keep a reference so the id isn't reused by another array
+                    self.shared[id(obj)] = (obj, name)
+            self.blocks.append(name)
+            return self.loader, (name, obj.shape, obj.dtype.str)
+        return NotImplemented
+
+
+def _dumps_shared(obj, loader=_attach_array, owner=True, shared=None):
+    """
+    Pickle an object, putting large arrays in shared memory.
+
+    Returns
+    -------
+    The pickled bytes and the names of the shared memory blocks it uses.
+    If pickling fails, the blocks already made are freed.
+    """
+    f = io.BytesIO()
+    pickler = _SharedPickler(f, loader=loader, owner=owner, shared=shared)
+    try:
+        pickler.dump(obj)
+    except BaseException:
+        _unlink(pickler.created)
+        if shared is not None:
+            for key in [k for k, (_, n) in shared.items() if n in pickler.created]:
+                del shared[key]
+        raise
+    return f.getvalue(), pickler.blocks
+
+
+def _unlink(blocks):
+    """Free shared memory blocks (that this process owns)."""
+    for name in blocks:
+        try:
+            shm = SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        shm.close()
+        shm.unlink()
+
+
+def _release_attached(blocks=_attached):
+    """Close this process's views of the shared memory blocks of a task."""
+    while blocks:
+        shm = blocks.pop()
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still in use (e.g., kept by the function); the
+            # block is freed when it is garbage collected.
+            pass
+
+
+# State of each worker process for the process backend. The function and
+# keyword arguments are sent to each worker once, by the pool initializer,
+# instead of being pickled with every task.
+_worker = {}
+
+
+def _init_worker(func, kwargs):
+    """Pool initializer: keep the function and kwargs in the worker."""
+    _worker["func"] = func
+    _worker["kwargs"] = kwargs
+
+
+def _init_worker_shared(func, kwargs_payload):
+    """Pool initializer for shared memory: kwargs arrays stay attached."""
+    _worker["func"] = func
+    _worker["kwargs"] = pickle.loads(kwargs_payload)
+    _worker["kwargs_blocks"] = list(_attached)
+    _attached.clear()
+
+
+def _run_chunk(chunk):
+    """
+    Run a chunk of (i, args) tasks in a worker process.
+
+    Returns
+    -------
+    A list of (i, result) and the average time (seconds) per task.
+    """
+    func, kwargs = _worker["func"], _worker["kwargs"]
+    timer = time.perf_counter()
+    results = [(i, func(*_as_args(args), **kwargs)) for i, args in chunk]
+    return results, (time.perf_counter() - timer) / len(chunk)
+
+
+def _run_chunk_shared(payload):
+    """
+    Run a chunk of tasks whose large arrays are in shared memory.
+
+    The arguments are read-only views of the parent's blocks. Large
+    arrays in the results are put in new blocks, which the parent
+    copies and frees.
+    """
+    try:
+        results, per_task = _run_chunk(pickle.loads(payload))
+        # The parent owns (and frees) the result blocks
+        payload, _ = _dumps_shared(results, loader=_copy_array, owner=False)
+        return payload, per_task
+    finally:
+        _release_attached()
+
+
+def _init_session(preload):
+    """ParallelSession pool initializer: import modules once per worker."""
+    for name in preload:
+        importlib.import_module(name)
+
+
+def _run_chunk_session(token, setup, shared_memory, chunk):
+    """
+    Run a chunk of tasks in a ParallelSession worker.
+
+    Warm workers are shared by many calls, so the function and kwargs
+    can't be sent by the pool initializer. Instead, they are sent with
+    each chunk (pickled once by the parent) and only loaded when the
+    worker gets a chunk from a different call.
+    """
+    if _worker.get("token") != token:
+        _release_attached(_worker.pop("kwargs_blocks", []))
+        if shared_memory:
+            _init_worker_shared(*pickle.loads(setup))
+        else:
+            _init_worker(*pickle.loads(setup))
+        _worker["token"] = token
+    if shared_memory:
+        return _run_chunk_shared(chunk)
+    return _run_chunk(chunk)
+
+
 def p_apply(df, func, cores=4):
     """
     Parallel Apply for Pandas DataFrames
@@ -74,6 +319,140 @@ def p_apply(df, func, cores=4):
     return df
 
 
+# Sessions entered with ``with``; EasyParallel uses the innermost one
+_sessions = []
+
+# Identifies each EasyParallel call made with a ParallelSession
+_session_calls = count()
+
+
+def _get_session(session=None):
+    """The given session, or else the active session (if any)."""
+    if session is None and _sessions:
+        return _sessions[-1]
+    return session
+
+
+class ParallelSession:
+    """Keep warm worker pools alive across many EasyParallel calls."""
+
+    def __init__(
+        self,
+        max_workers=4,
+        max_threads=10,
+        start_method=None,
+        preload=(),
+        maxtasksperchild=None,
+    ):
+        """
+        Keep warm worker pools alive across many EasyParallel calls.
+
+        Creating worker processes is slow, especially with the 'spawn'
+        start method, where each worker imports the modules it needs
+        (xarray, cartopy, matplotlib, ...) from scratch. A session
+        starts its process and thread pools once, as needed, and
+        EasyParallel uses them for every call made inside the session.
+
+        .. code-block:: python
+
+            with ParallelSession(start_method="spawn", preload=["xarray"]):
+                for hour in range(24):
+                    EasyParallel(my_func, files[hour]).multipro()
+
+        A session may also be passed to the EasyParallel methods with
+        ``session=``. Call ``close()`` when done if not using ``with``.
+
+        Parameters
+        ----------
+        max_workers : int
+            Number of worker processes.
+        max_threads : int
+            Number of worker threads.
+        start_method : {None, 'fork', 'spawn', 'forkserver'}
+            How worker processes are started. None uses the default for
+            the platform.
+        preload : list of str
+            Modules each worker process imports when it starts. With
+            'forkserver', these (and this module) are also imported by
+            the server that the workers are forked from, so new workers
+            start with them already imported.
+        maxtasksperchild : int
+            Replace each worker process after it completes this many
+            tasks, to limit memory leaks. With ``multipro``, each chunk
+            of tasks counts as one task. Requires Python 3.11+ and a
+            start method other than 'fork'.
+        """
+        if not isinstance(max_workers, int) or not isinstance(max_threads, int):
+            raise ValueError("max_workers and max_threads must be an int.")
+        methods = multiprocessing.get_all_start_methods()
+        if start_method is not None and start_method not in methods:
+            raise ValueError(f"👻 start_method must be one of {methods}")
+        if maxtasksperchild is not None:
+            if sys.version_info < (3, 11):
+                raise ValueError("👻 maxtasksperchild requires Python 3.11+")
+            if start_method == "fork":
+                raise ValueError("👻 maxtasksperchild can't be used with 'fork'")
+
+        self.max_workers = max_workers
+        self.max_threads = max_threads
+        self.start_method = start_method
+        self.preload = list(preload)
+        self.maxtasksperchild = maxtasksperchild
+        self._processes = None
+        self._threads = None
+
+    def __repr__(self):
+        return (
+            f"ParallelSession({self.max_workers=}, {self.max_threads=}, "
+            f"{self.start_method=}, {self.preload=}, {self.maxtasksperchild=})"
+        )
+
+    @property
+    def processes(self):
+        """The session's ProcessPoolExecutor (created on first use)."""
+        if self._processes is None:
+            ctx = None
+            if self.start_method is not None:
+                ctx = multiprocessing.get_context(self.start_method)
+                if self.start_method == "forkserver":
+                    # The workers need this module to run the tasks
+                    ctx.set_forkserver_preload([__name__, *self.preload])
+            kwargs = {}
+            if self.maxtasksperchild is not None:
+                kwargs["max_tasks_per_child"] = self.maxtasksperchild
+            self._processes = ProcessPoolExecutor(
+                self.max_workers,
+                mp_context=ctx,
+                initializer=_init_session,
+                initargs=(self.preload,),
+                **kwargs,
+            )
+        return self._processes
+
+    @property
+    def threads(self):
+        """The session's ThreadPoolExecutor (created on first use)."""
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.max_threads)
+        return self._threads
+
+    def close(self):
+        """Shut down the worker pools."""
+        for pool in (self._processes, self._threads):
+            if pool is not None:
+                pool.shutdown()
+        self._processes = None
+        self._threads = None
+
+    def __enter__(self):
+        _sessions.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _sessions.remove(self)
+        self.close()
+
+
 class EasyParallel:
     """A class to help you complete embarrassingly parallel tasks."""
 
@@ -88,10 +467,13 @@ class EasyParallel:
         ----------
         func : function
             A function you want to iterate over.
-        args : list
-            A list of input arguments for the function being called.
-            These are *different* for each process. If multiple arguments
-            are needed, then each item in the list should be a tuple.
+        args : iterable
+            Input arguments for the function being called. These are
+            *different* for each process. If multiple arguments are
+            needed, then each item should be a tuple. May be any
+            iterable, including a generator (e.g., a file walker that
+            yields millions of paths), which is only read as workers
+            are ready for more tasks. A generator can only be used once.
         verbose : bool
             If True, print lots of info.
         kwargs : dict
@@ -99,16 +481,28 @@ class EasyParallel:
             These are the *same* for each process.
         """
         assert callable(func), f"👻 {func} must be a callable function."
-        assert hasattr(args, "__len__"), f"👻 args must have length."
+        assert hasattr(args, "__iter__"), f"👻 args must be iterable."
         assert isinstance(kwargs, dict), f"👻 kwargs must be a dict."
 
         self.func = func
         self.args = args
         self.kwargs = kwargs
-        self.n = len(args)
+        self.n = len(args) if hasattr(args, "__len__") else None
         self.verbose = verbose
 
-        self.inputs = [(i, arg) for i, arg in enumerate(self.args, start=1)]
+    @property
+    def inputs(self):
+        """Iterator of (i, arg) for each task, starting at 1."""
+        return enumerate(self.args, start=1)
+
+    @property
+    def _n_items(self):
+        """Number of tasks for messages."""
+        return "unknown number of" if self.n is None else f"{self.n:,}"
+
+    def _workers(self, max_workers):
+        """Number of workers needed, which is no more than the number of tasks."""
+        return max_workers if self.n is None else max(1, min(max_workers, self.n))
 
     def __repr__(self):
         msg = [
@@ -133,17 +527,59 @@ class EasyParallel:
             i,
             args,
         ) = job_arg
-        if not hasattr(args, "__len__"):
-            args = [args]
-        output = self.func(*args, **self.kwargs)
+        output = self.func(*_as_args(args), **self.kwargs)
 
         if self.verbose:
+            total = "" if self.n is None else f"/{self.n:,}"
             print(
-                f"\r    ⏳ {process}/{thread} completed task [{i:,}/{self.n:,}] {' '*15}",
+                f"\r    ⏳ {process}/{thread} completed task [{i:,}{total}] {' '*15}",
                 end="\r",
             )
         return output
 
+    def _stream(self, Executor, workers, ordered=True, window=None, session=None):
+        """
+        Run the tasks with an Executor and yield (index, result) pairs.
+
+        Tasks are read from ``self.inputs`` and submitted only as
+        results are yielded, so at most ``window`` tasks are submitted
+        but not yet yielded. If a session is given, its thread pool is
+        used instead of a new Executor.
+        """
+        window = window or 2 * workers
+        pool = Executor(workers) if session is None else nullcontext(session.threads)
+        with pool as exe:
+            jobs = iter(self.inputs)
+            pending = {}  # future: index
+            submitted = deque()  # futures in the order submitted
+
+            def _submit():
+                job = next(jobs, None)
+                if job is not None:
+                    future = exe.submit(self._helper, job)
+                    pending[future] = job[0]
+                    if ordered:
+                        submitted.append(future)
+
+            for _ in range(window):
+                _submit()
+
+            try:
+                while pending:
+                    if ordered:
+                        done = [submitted.popleft()]
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        i = pending.pop(future)
+                        _submit()
+                        yield i, result
+            finally:
+                # If the caller stops early, don't start the queued tasks
+                for future in pending:
+                    future.cancel()
+
     def sequential(self):
         """Compute tasks sequentially (by list comprehension)"""
         timer = datetime.now()
@@ -151,7 +587,7 @@ class EasyParallel:
 
         print(
             f"📏 Sequentially do [{self.func.__module__}.{self.func.__name__}] "
-            f"for [{self.n:,}] items."
+            f"for [{self._n_items}] items."
         )
 
         results = [self._helper(i) for i in self.inputs]
@@ -161,9 +597,271 @@ class EasyParallel:
 
         return results
 
-    def multipro(self, max_cpus=4):
+    def _stream_chunks(
+        self,
+        workers,
+        ordered=True,
+        target_chunk_time=0.1,
+        shared_memory=False,
+        session=None,
+        window=None,
+    ):
+        """
+        Run the tasks in worker processes and yield (index, result) pairs.
+
+        The function and kwargs are sent to each worker once. Tasks are
+        sent in chunks; the chunk size is adjusted so each chunk takes
+        about ``target_chunk_time`` seconds, based on the task time
+        measured by the workers. The first chunks have one task each.
+        At most ``window`` chunks (default twice the number of workers)
+        are submitted but not yet yielded.
+
+        If ``shared_memory``, large arrays in the arguments, kwargs and
+        results are sent through shared memory blocks. Each distinct
+        argument array is copied to a block once, which is freed as soon
+        as no submitted chunk uses it (or a chunk fails). The kwargs
+        blocks are freed when the call is done.
+
+        If a session is given, its warm process pool is used instead of
+        starting new workers.
+        """
+        jobs = iter(self.inputs)
+        window = window or 2 * workers
+        if self.n is None:
+            max_chunksize = 10_000
+        else:
+            # Keep enough chunks to balance the work between workers
+            max_chunksize = max(1, self.n // (4 * workers))
+
+        chunksize = 1
+        latency = None
+        completed = 0
+        timer = time.perf_counter()
+
+        if shared_memory:
+            kwargs_payload, kwargs_blocks = _dumps_shared(self.kwargs)
+            initializer, initargs = _init_worker_shared, (self.func, kwargs_payload)
+        else:
+            kwargs_blocks = []
+            initializer, initargs = _init_worker, (self.func, self.kwargs)
+
+        if session is None:
+            pool = ProcessPoolExecutor(
+                workers, initializer=initializer, initargs=initargs
+            )
+            task = (_run_chunk_shared if shared_memory else _run_chunk,)
+        else:
+            pool = nullcontext(session.processes)
+            setup = pickle.dumps(initargs, protocol=pickle.HIGHEST_PROTOCOL)
+            task = (_run_chunk_session, next(_session_calls), setup, shared_memory)
+
+        with pool as exe:
+            pending = {}  # future: shared memory blocks of the arguments
+            submitted = deque()
+            shared = {}  # id(array): (array, block name)
+            refs = {}  # block name: number of pending chunks using it
+
+            def _submit():
+                chunk = list(islice(jobs, chunksize))
+                if chunk:
+                    if shared_memory:
+                        chunk, blocks = _dumps_shared(chunk, shared=shared)
+                        blocks = set(blocks)
+                        for name in blocks:
+                            refs[name] = refs.get(name, 0) + 1
+                    else:
+                        blocks = set()
+                    future = exe.submit(*task, chunk)
+                    pending[future] = blocks
+                    if ordered:
+                        submitted.append(future)
+
+            def _release(future):
+                """Free the blocks no other pending chunk uses."""
+                for name in pending.pop(future):
+                    refs[name] -= 1
+                    if not refs[name]:
+                        del refs[name]
+                        for key in [k for k, (_, n) in shared.items() if n == name]:
+                            del shared[key]
+                        _unlink([name])
+
+            def _result(future):
+                results, per_task = future.result()
+                if shared_memory:
+                    results = pickle.loads(results)
+                return results, per_task
+
+            try:
+                for _ in range(window):
+                    _submit()
+
+                while pending:
+                    if ordered:
+                        done = [submitted.popleft()]
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results, per_task = _result(future)
+
+                        # Moving average of the time per task
+                        if latency is None:
+                            latency = per_task
+                        else:
+                            latency = 0.8 * latency + 0.2 * per_task
+                        chunksize = target_chunk_time / max(latency, 1e-6)
+                        chunksize = int(min(max(chunksize, 1), max_chunksize))
+
+                        completed += len(results)
+                        if self.verbose:
+                            total = "" if self.n is None else f"/{self.n:,}"
+                            print(
+                                f"\r    ⏳ completed task [{completed:,}{total}] "
+                                f"({chunksize=}) {' '*15}",
+                                end="\r",
+                            )
+                        # Submit the next chunk before releasing this one,
+                        # so blocks of arrays used by every task are kept
+                        _submit()
+                        _release(future)
+                        yield from results
+            finally:
+                for future in list(pending):
+                    if not future.cancel():
+                        # Wait for running tasks so their blocks are freed
+                        try:
+                            _result(future)
+                        except Exception:
+                            pass
+                    _release(future)
+                _unlink(kwargs_blocks)
+
+                seconds = time.perf_counter() - timer
+                self._chunk_info = dict(
+                    chunksize=chunksize,
+                    task_seconds=latency,
+                    tasks_per_second=completed / seconds if seconds else None,
+                )
+
+    def iter(
+        self,
+        backend="threads",
+        ordered=True,
+        max_workers=4,
+        window=None,
+        shared_memory=False,
+        session=None,
+    ):
+        """
+        Yield results as tasks complete.
+
+        Only a limited number of tasks are in progress at once, so the
+        results don't all need to be held in memory and you can start
+        working with the first results (e.g., write them to a file)
+        before the last task is done.
+
+        .. code-block:: python
+
+            for i, result in ezpz.iter(backend="processes", ordered=False):
+                write(result)
+
+        Parameters
+        ----------
+        backend : {'threads', 'processes', 'sequential'}
+            Use threads for IO-bound tasks and processes for CPU-bound
+            tasks. Processes get tasks in chunks (see ``multipro``).
+        ordered : bool
+            If True, yield results in the order of the inputs. If False,
+            yield results in the order they are completed.
+        max_workers : int
+            Number of threads or processes.
+        window : int
+            Maximum number of tasks submitted but not yet yielded.
+            Default is twice the number of workers. For processes, this
+            is the number of chunks of tasks.
+        shared_memory : bool
+            For processes, send large arrays through shared memory (see
+            ``multipro``).
+        session : ParallelSession
+            Use the warm worker pools of this session. Default is the
+            active session, if any.
+
+        Yields
+        ------
+        (index, result) for each task. The index is the position of the
+        task's arguments, starting at 1.
+        """
+        _backend = {"threads", "processes", "sequential"}
+        assert backend in _backend, f"👻 backend must be one of {_backend}"
+        if not isinstance(max_workers, int):
+            raise ValueError("max_workers must be an int.")
+
+        timer = datetime.now()
+        session = _get_session(session)
+        if session is not None:
+            if backend == "processes":
+                max_workers = min(max_workers, session.max_workers)
+            elif backend == "threads":
+                max_workers = min(max_workers, session.max_threads)
+        workers = self._workers(max_workers)
+
+        print(
+            f"🚰 Streaming [{self.func.__module__}.{self.func.__name__}] "
+            f"with [{workers=} {backend=}] for [{self._n_items}] items."
+        )
+
+        if backend == "sequential":
+            for job in self.inputs:
+                yield job[0], self._helper(job)
+        elif backend == "threads":
+            yield from self._stream(
+                ThreadPoolExecutor, workers, ordered, window, session=session
+            )
+        else:
+            yield from self._stream_chunks(
+                workers,
+                ordered,
+                shared_memory=shared_memory,
+                session=session,
+                window=window,
+            )
+
+        self.info = {}
+        self.info["type"] = f"iter ({backend})"
+        self.info["workers"] = workers
+        self.info["timer"] = datetime.now() - timer
+        if backend == "processes":
+            self.info.update(self._chunk_info)
+
+    def multipro(
+        self, max_cpus=4, target_chunk_time=0.1, shared_memory=False, session=None
+    ):
         """
         Use multiprocessing to complete all jobs.
+
+        The function and kwargs are sent to each worker process once,
+        and the arguments are sent in chunks. The chunk size adapts to
+        the time each task takes, so many tiny tasks don't spend most of
+        their time sending data between processes. The achieved number
+        of tasks per second is in ``self.info``.
+
+        Parameters
+        ----------
+        max_cpus : int
+            Maximum number of worker processes.
+        target_chunk_time : float
+            About how long (seconds) each chunk of tasks should take.
+        shared_memory : bool
+            If True, NumPy arrays (including the data of xarray objects)
+            of at least ``SHARED_MEMORY_MIN_BYTES`` in the arguments,
+            kwargs, and results are sent to and from the workers through
+            shared memory instead of being pickled. The workers get
+            read-only views of the arrays, so the function must not
+            modify its inputs. The shared memory is freed when each task
+            is done, even if it fails.
+        session : ParallelSession
+            Use the warm worker processes of this session instead of
+            starting new ones. Default is the active session, if any.
         """
 
         if not isinstance(max_cpus, int):
@@ -172,29 +870,42 @@ class EasyParallel:
         timer = datetime.now()
         self.info = {}
 
+        session = _get_session(session)
         cpus = min(max_cpus, multiprocessing.cpu_count())
-        cpus = min(max_cpus, self.n)
+        if session is not None:
+            cpus = min(cpus, session.max_workers)
+        cpus = self._workers(cpus)
 
         print(
             f"🤹🏻‍♂️ Multiprocessing [{self.func.__module__}.{self.func.__name__}] "
-            f"with [{cpus:,}] CPUs for [{self.n:,}] items."
+            f"with [{cpus:,}] CPUs for [{self._n_items}] items."
         )
-        with multiprocessing.Pool(cpus) as p:
-            results = p.map(self._helper, self.inputs)
-            p.close()
-            p.join()
+        results = [
+            result
+            for _, result in self._stream_chunks(
+                cpus,
+                ordered=True,
+                target_chunk_time=target_chunk_time,
+                shared_memory=shared_memory,
+                session=session,
+            )
+        ]
 
         self.info["type"] = "multiprocessing"
         self.info["cpus"] = cpus
         self.info["timer"] = datetime.now() - timer
+        self.info.update(self._chunk_info)
 
         return results
 
-    def multithread(self, max_threads=10):
+    def multithread(self, max_threads=10, session=None):
         """
         Use multithreading to complete all jobs (method 1)
 
         NOTE: results are returned in order completed, not order submitted.
+
+        If there is a ParallelSession (given or active), its warm thread
+        pool is used.
         """
 
         if not isinstance(max_threads, int):
@@ -206,26 +917,24 @@ class EasyParallel:
         if not isinstance(max_threads, int):
             raise ValueError("max_threads must be an int.")
 
-        threads = min(max_threads, self.n)
+        session = _get_session(session)
+        if session is not None:
+            max_threads = min(max_threads, session.max_threads)
+        threads = self._workers(max_threads)
 
         print(
             f"🧵 Multithreading [{self.func.__module__}.{self.func.__name__}] "
-            f"with [{threads=}] for [{self.n:,}] items."
+            f"with [{threads=}] for [{self._n_items}] items."
         )
 
-        with ThreadPoolExecutor(threads) as exe:
-            futures = [
-                exe.submit(self.func, *arg, **self.kwargs)
-                if hasattr(arg, "__len__")
-                else exe.submit(self.func, arg, **self.kwargs)
-                for arg in self.args
-            ]
-
-            results = []
-            # Return list of results in order completed
-            for i, future in enumerate(as_completed(futures), start=1):
-                results.append(future.result())
-                print(f"Finished {i}/{self.n} tasks.", end="\r")
+        # Return list of results in order completed. Tasks are submitted
+        # as others finish, not all up front.
+        results = [
+            result
+            for _, result in self._stream(
+                ThreadPoolExecutor, threads, ordered=False, session=session
+            )
+        ]
 
         self.info["type"] = "multithreading (method 1)"
         self.info["threads"] = threads
@@ -233,9 +942,14 @@ class EasyParallel:
 
         return results
 
-    def multithread2(self, max_threads=10):
+    def multithread2(self, max_threads=10, session=None):
         """
         Use multithreading to complete all jobs (method 2)
+
+        NOTE: results are returned in order submitted.
+
+        If there is a ParallelSession (given or active), its warm thread
+        pool is used.
         """
         if not isinstance(max_threads, int):
             raise ValueError("max_threads must be an int.")
@@ -243,16 +957,23 @@ class EasyParallel:
         timer = datetime.now()
         self.info = {}
 
-        threads = min(max_threads, self.n)
+        session = _get_session(session)
+        if session is not None:
+            max_threads = min(max_threads, session.max_threads)
+        threads = self._workers(max_threads)
 
         print(
             f"🧵 Multithreading [{self.func.__module__}.{self.func.__name__}] "
-            f"with [{threads=}] for [{self.n:,}] items."
+            f"with [{threads=}] for [{self._n_items}] items."
         )
-        with ThreadPool(threads) as p:
-            results = p.map(self._helper, self.inputs)
-            p.close()
-            p.join()
+        # Return list of results in the order submitted. Tasks are
+        # submitted as others finish, so the inputs are read as needed.
+        results = [
+            result
+            for _, result in self._stream(
+                ThreadPoolExecutor, threads, ordered=True, session=session
+            )
+        ]
 
         self.info["type"] = "multithreading (method 2)"
         self.info["threads"] = threads
@@ -287,13 +1008,13 @@ class EasyParallel:
         jobs = [dask.delayed(self._helper)(i) for i in self.inputs]
 
         if schedular == "processes":
-            workers = min(max_workers, self.n)
+            workers = self._workers(max_workers)
         else:
             workers = None
 
         print(
             f"🐲 Dask delayed [{self.func.__module__}.{self.func.__name__}] "
-            f"with [{workers=} {schedular=}] for [{self.n:,}] items."
+            f"with [{workers=} {schedular=}] for [{len(jobs):,}] items."
         )
 
         results = dask.compute(jobs, num_workers=workers, scheduler=schedular)[0]